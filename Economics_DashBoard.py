@@ -1,12 +1,24 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
-import wbdata
 import re
 import datetime
-from plotly.subplots import make_subplots
-import weo 
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from country_catalog import load_country_catalog
+from economic_data import (
+    grouped_indicators,
+    all_indicators,
+    fetch_indicators,
+    reshape_indicators,
+    find_latest_weo_release,
+    weo_projection_frame,
+)
+from derived_indicators import DerivedIndicatorEngine, DERIVED_TOPIC, derived_indicators
+from cross_country import CrossCountryAnalytics
+from export_data import find_indicator_extract, read_indicator_extract
+from model_registry import ModelRegistry, DEFAULT_INDICATORS, data_hash
+import diagnostics
 
 st.set_page_config(
     page_title="📊 Analyse de l'Économie Mondiale",
@@ -32,67 +44,6 @@ hide_streamlit_style = """
 """
 st.markdown(hide_streamlit_style, unsafe_allow_html=True)
 
-grouped_indicators = {
-    "Business Environment": {
-        "IC.BUS.EASE.DFRN.XQ.DB1719": "Global: Ease of doing business score (DB17-20 methodology)",
-        "IC.BUS.EASE.XQ": "Ease of doing business rank (1=most business-friendly regulations)",
-        "IC.CNST.PRMT.RK": "Rank: Dealing with construction permits (1=most business-friendly regulations)",
-        "IC.CRED.ACC.CRD.RK": "Rank: Getting credit (1=most business-friendly regulations)",
-        "IC.ELC.ACES.RK.DB19": "Rank: Getting electricity (1=most business-friendly regulations)",
-        "IC.REG.STRT.BUS.RK.DB19": "Rank: Starting a business (1=most business-friendly regulations)",
-        "PAY.TAX.RK.DB19": "Rank: Paying taxes (1=most business-friendly regulations)",
-        "RESLV.ISV.RK.DB19": "Rank: Resolving insolvency (1=most business-friendly regulations)",
-        "TRD.ACRS.BRDR.RK.DB19": "Rank: Trading across borders (1=most business-friendly regulations)",
-    },
-    "Economic Performance": {
-        "NY.GDP.MKTP.CD": "GDP (current US$)",
-        "NY.GDP.PCAP.CD": "GDP per capita (current US$)",
-        "NY.GDP.DEFL.KD.ZG": "Inflation, GDP deflator (annual %)",
-        "NY.GDP.MKTP.KD.ZG": "GDP growth (annual %)",
-        "NY.GDP.PCAP.KD.ZG": "GDP per capita growth (annual %)",
-        "NY.GNS.ICTR.CD": "Gross savings (current US$)",
-    },
-    "Trade & Investment": {
-        "BG.GSR.NFSV.GD.ZS": "Trade in services (% of GDP)",
-        "BM.GSR.GNFS.CD": "Imports of goods and services (BoP, current US$)",
-        "BM.KLT.DINV.WD.GD.ZS": "Foreign direct investment, net outflows (% of GDP)",
-        "BN.CAB.XOKA.GD.ZS": "Current account balance (% of GDP)",
-        "BN.KLT.DINV.CD": "Foreign direct investment, net (BoP, current US$)",
-        "BN.KLT.PTXL.CD": "Portfolio Investment, net (BoP, current US$)",
-        "BX.GSR.GNFS.CD": "Exports of goods and services (BoP, current US$)",
-    },
-    "Financial Indicators": {
-        "CM.MKT.LCAP.GD.ZS": "Market capitalization of listed domestic companies (% of GDP)",
-        "GB.XPD.RSDV.GD.ZS": "Research and development expenditure (% of GDP)",
-        "GC.DOD.TOTL.GD.ZS": "Central government debt, total (% of GDP)",
-    },
-    "Social Indicators": {
-        "EN.POP.DNST": "Population density (people per sq. km of land area)",
-        "FI.RES.TOTL.CD": "Total reserves (includes gold, current US$)",
-        "FP.CPI.TOTL": "Consumer price index (2010 = 100)",
-        "FP.CPI.TOTL.ZG": "Inflation, consumer prices (annual %)",
-        "FP.WPI.TOTL": "Wholesale price index (2010 = 100)",
-        "SE.ADT.LITR.ZS": "Literacy rate, adult total (% of people ages 15 and above)",
-        "SE.ADT.1524.LT.ZS": "Literacy rate, youth total (% of people ages 15-24)",
-        "SH.DTH.IMRT": "Number of infant deaths",
-        "SH.MED.BEDS.ZS": "Hospital beds (per 1,000 people)",
-        "SI.POV.GINI": "Gini index",
-        "SL.UEM.1524.NE.ZS": "Unemployment, youth total (% of total labor force ages 15-24) (national estimate)",
-        "SL.UEM.TOTL.NE.ZS": "Unemployment, total (% of total labor force) (national estimate)",
-        "SM.POP.NETM": "Net migration",
-        "SP.DYN.LE00.IN": "Life expectancy at birth, total (years)",
-        "SP.POP.GROW": "Population growth (annual %)",
-        "SP.POP.TOTL": "Population, total",
-        "SP.RUR.TOTL": "Rural population",
-        "SP.URB.TOTL": "Urban population",
-    },
-    "Governance Indicators": {
-        "GE.EST": "Government Effectiveness: Estimate",
-        "PV.EST": "Political Stability and Absence of Violence/Terrorism: Estimate",
-    },
-}
-
-
 indicator_descriptions = {
     "IC.BUS.EASE.DFRN.XQ.DB1719": (
         "Cette variable représente le score global de facilité de faire des affaires, calculé selon la méthodologie DB17-20. "
@@ -240,6 +191,27 @@ indicator_descriptions = {
     "PV.EST": (
         "La stabilité politique et l'absence de violence/terrorisme évaluent la probabilité de désordres politiques, de violence ou de terrorisme dans un pays."
     ),
+    "DRV.TRD.OPEN.GD.ZS": (
+        "L'ouverture commerciale rapporte la somme des exportations et des importations de biens et services au PIB. "
+        "Elle mesure le degré d'intégration d'une économie dans le commerce international."
+    ),
+    "DRV.TRD.BAL.GD.ZS": (
+        "La balance commerciale rapporte la différence entre exportations et importations de biens et services au PIB. "
+        "Un solde positif indique un excédent commercial."
+    ),
+    "DRV.GNS.GD.ZS": (
+        "L'épargne brute en pourcentage du PIB mesure la part du revenu national qui n'est pas consommée et peut financer l'investissement."
+    ),
+    "DRV.RES.GD.ZS": (
+        "Les réserves totales en pourcentage du PIB indiquent la capacité d'un pays à faire face à des chocs extérieurs ou à défendre sa monnaie."
+    ),
+    "DRV.URB.TOTL.ZS": (
+        "La part de la population urbaine rapporte la population vivant en zone urbaine à la population totale. "
+        "Elle reflète le degré d'urbanisation du pays."
+    ),
+    "DRV.RUR.TOTL.ZS": (
+        "La part de la population rurale rapporte la population vivant en zone rurale à la population totale."
+    ),
 }
 
 
@@ -252,16 +224,43 @@ def sanitize_key(text):
     text = re.sub(r'\W+', '', text)
     return text
 
-@st.cache_data
+@st.cache_data(show_spinner=False)
 def fetch_data(indicators, countries, date_range):
     """
     Fetches data from wbdata and returns a DataFrame.
     """
-    return wbdata.get_dataframe(
-        indicators,
-        country=countries,
-        date=date_range,
-    )
+    return fetch_indicators(indicators, countries, date_range)
+
+@st.cache_resource
+def load_derived_engine():
+    """
+    Shared derived-indicator engine; its bounded result cache persists across reruns and sessions.
+    """
+    return DerivedIndicatorEngine()
+
+@st.cache_data(ttl=3600)
+def load_model_forecasts(country_iso, indicator):
+    """
+    Reads the precomputed model forecasts from the local model registry.
+    Models are never trained here; run `python model_registry.py` to refresh them.
+    """
+    return ModelRegistry().load_forecasts(country_iso, indicator)
+
+@st.cache_data(ttl=datetime.timedelta(days=1))
+def load_countries():
+    """
+    Returns the World Bank country catalog as an (id, name) DataFrame sorted by name.
+    Read from the bundled snapshot, so the first render never waits on the network.
+    """
+    countries_data = load_country_catalog()
+    return pd.DataFrame(countries_data)[["id", "name"]].sort_values("name")
+
+@st.cache_data
+def compute_diagnostics(vintage, _panel, nlags, lb_lags, window):
+    """
+    Runs the panel diagnostics, cached per data vintage (the panel itself is not hashed).
+    """
+    return diagnostics.panel_diagnostics(_panel, nlags=nlags, lb_lags=lb_lags, window=window)
 
 rank_indicators = [
     "IC.BUS.EASE.XQ",
@@ -274,13 +273,284 @@ rank_indicators = [
     "TRD.ACRS.BRDR.RK.DB19",
 ]
 
+def render_indicator(col, topic, indicator_id, indicator_name, df_topic, end_year):
+    """
+    Draws the chart and description of one indicator into `col`.
+    """
+    if indicator_id == "SP.POP.TOTL":
+        pop_growth_id = "SP.POP.GROW"
+        pop_growth_name = grouped_indicators[topic].get(pop_growth_id, "Population growth")
+
+        df_pop_total = df_topic[df_topic["indicator_id"] == indicator_id]
+        df_pop_growth = df_topic[df_topic["indicator_id"] == pop_growth_id]
+
+        if df_pop_growth.empty:
+            col.warning(f"L'indicateur de croissance de la population '{pop_growth_name}' est manquant.")
+            return
+
+        df_combined = pd.merge(
+            df_pop_total[['country', 'date', 'value']],
+            df_pop_growth[['country', 'date', 'value']],
+            on=['country', 'date'],
+            suffixes=('_total', '_growth')
+        )
+
+        gdp_pivot_total = df_combined.pivot(index="date", columns="country", values="value_total")
+        gdp_pivot_growth = df_combined.pivot(index="date", columns="country", values="value_growth")
+
+        countries_with_no_data_total = gdp_pivot_total.columns[gdp_pivot_total.isna().all()].tolist()
+        countries_with_no_data_growth = gdp_pivot_growth.columns[gdp_pivot_growth.isna().all()].tolist()
+        countries_with_no_data = list(set(countries_with_no_data_total + countries_with_no_data_growth))
+
+        gdp_pivot_total = gdp_pivot_total.drop(columns=countries_with_no_data, errors='ignore')
+        gdp_pivot_growth = gdp_pivot_growth.drop(columns=countries_with_no_data, errors='ignore')
+
+        if countries_with_no_data:
+            col.info(f"Pour les indicateurs 'Population, total' et 'Population growth', les pays suivants ont été exclus en raison de l'absence de données : {', '.join(countries_with_no_data)}.")
+
+        if gdp_pivot_total.empty and gdp_pivot_growth.empty:
+            col.write("Aucune donnée disponible pour les pays sélectionnés après exclusion des pays sans données.")
+            return
+
+        earliest_year_total = gdp_pivot_total.dropna().index.min() if not gdp_pivot_total.empty else None
+        earliest_year_growth = gdp_pivot_growth.dropna().index.min() if not gdp_pivot_growth.empty else None
+        earliest_year = min(filter(None, [earliest_year_total, earliest_year_growth]))
+        latest_year = max(
+            gdp_pivot_total.dropna().index.max() if not gdp_pivot_total.empty else 0,
+            gdp_pivot_growth.dropna().index.max() if not gdp_pivot_growth.empty else 0
+        )
+
+        from plotly.subplots import make_subplots
+
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+
+        if not gdp_pivot_total.empty:
+            for country in gdp_pivot_total.columns:
+                fig.add_trace(
+                    go.Bar(
+                        x=gdp_pivot_total.index,
+                        y=gdp_pivot_total[country],
+                        name=f"{country} - Population Totale",
+                        opacity=0.6
+                    ),
+                    secondary_y=False,
+                )
+
+        if not gdp_pivot_growth.empty:
+            for country in gdp_pivot_growth.columns:
+                fig.add_trace(
+                    go.Scatter(
+                        x=gdp_pivot_growth.index,
+                        y=gdp_pivot_growth[country],
+                        mode="lines",
+                        name=f"{country} - Croissance de la Population",
+                        line=dict(width=2),
+                        hovertemplate='%{y}%'
+                    ),
+                    secondary_y=True,
+                )
+
+        fig.update_layout(
+            title_text="Population Totale et Croissance de la Population",
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,  
+                xanchor="center",
+                x=0.5
+            ),
+            template="plotly_white",
+            height=600,
+            margin=dict(r=50, t=100, l=50, b=80)
+        )
+
+        fig.update_yaxes(title_text="Population Totale", secondary_y=False)
+        fig.update_yaxes(title_text="Croissance de la Population (%)", secondary_y=True)
+
+        fig.update_xaxes(range=[earliest_year, end_year], dtick=2, title_text="Année")
+
+        col.plotly_chart(fig, use_container_width=True, key="combined_population_plot")
+
+        col.markdown(
+            """
+            **Population Totale et Croissance de la Population**
+
+            - **Population Totale**: Représente le nombre total d'habitants dans un pays à un moment donné. C'est une mesure clé de la taille démographique et a des implications sur le marché du travail, la demande de biens et services, et la planification des infrastructures.
+
+            - **Croissance de la Population**: Indique le taux auquel la population d'un pays augmente ou diminue chaque année. Une croissance positive peut signaler une expansion économique potentielle mais aussi des défis en termes de ressources et de services publics. Une croissance négative peut indiquer un vieillissement de la population ou des défis démographiques.
+            """
+        )
+        return
+
+    if indicator_id in rank_indicators:
+        plot_type = "bar"
+    else:
+        plot_type = "line"
+
+    df_ind = df_topic[df_topic["indicator_id"] == indicator_id]
+
+    gdp_pivot = df_ind.pivot(index="date", columns="country", values="value")
+
+    countries_with_no_data = gdp_pivot.columns[gdp_pivot.isna().all()].tolist()
+
+    gdp_pivot = gdp_pivot.drop(columns=countries_with_no_data, errors='ignore')
+
+    if countries_with_no_data:
+        col.info(f"Pour l'indicateur '{indicator_name}', les pays suivants ont été exclus en raison de l'absence de données : {', '.join(countries_with_no_data)}.")
+
+    if gdp_pivot.empty:
+        col.write("Aucune donnée disponible pour les pays sélectionnés après exclusion des pays sans données.")
+        return
+
+    years_with_data = gdp_pivot.index[gdp_pivot.notna().any(axis=1)].tolist()
+
+    gdp_pivot_filtered = gdp_pivot.loc[years_with_data]
+
+    earliest_year = gdp_pivot_filtered.index.min()
+
+    fig = go.Figure()
+
+    if plot_type == "bar":
+        for country in gdp_pivot_filtered.columns:
+            fig.add_trace(
+                go.Bar(
+                    x=gdp_pivot_filtered.index,
+                    y=gdp_pivot_filtered[country],
+                    name=country
+                )
+            )
+        fig.update_layout(
+            yaxis_title=indicator_name,
+            barmode='group',
+            title={
+                'text': indicator_name,
+                'y':0.95,
+                'x':0.5,
+                'xanchor': 'center',
+                'yanchor': 'top'
+            },
+            xaxis=dict(
+                categoryorder='category ascending',
+                tickmode='array',
+                tickvals=years_with_data,
+                ticktext=[str(year) for year in years_with_data],
+                title_text="Année"
+            ),
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,  
+                xanchor="center",
+                x=0.5
+            ),
+            template="plotly_white",
+            height=400,
+            margin=dict(r=0, t=80, l=0, b=80)
+        )
+    else:
+        for country in gdp_pivot_filtered.columns:
+            fig.add_trace(
+                go.Scatter(
+                    x=gdp_pivot_filtered.index,
+                    y=gdp_pivot_filtered[country],
+                    mode="lines",
+                    name=country,
+                    line=dict(width=2)
+                )
+            )
+        fig.update_layout(
+            yaxis_title=indicator_name,
+            title={
+                'text': indicator_name,
+                'y':0.95,
+                'x':0.5,
+                'xanchor': 'center',
+                'yanchor': 'top'
+            },
+            xaxis=dict(
+                range=[earliest_year, end_year],
+                dtick=2, 
+                title_text="Année"
+            ),
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02, 
+                xanchor="center",
+                x=0.5
+            ),
+            template="plotly_white",
+            height=400,
+            margin=dict(r=0, t=80, l=0, b=80)
+        )
+
+    fig.update_layout(
+        legend_title_text="Pays",
+        xaxis_title="Année",
+        yaxis_title=indicator_name,
+        template="plotly_white",
+        height=400,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5
+        ),
+        margin=dict(r=0, t=80, l=0, b=80)
+    )
+
+    sanitized_topic = sanitize_key(topic)
+    sanitized_indicator = sanitize_key(indicator_name)
+    plot_key = f"plot_{sanitized_topic}_{sanitized_indicator}"
+
+    col.plotly_chart(fig, use_container_width=True, key=plot_key)
+
+    description = indicator_descriptions.get(indicator_id, "Description non disponible pour cet indicateur.")
+    col.markdown(
+        f"""
+        **{indicator_name}**
+
+        {description}
+        """
+    )
+
+
+def render_slot(slot, frames, errors, engine, end_year):
+    """
+    Fills one chart placeholder once all the indicators it depends on have been fetched.
+    """
+    topic, indicator_id, indicator_name, dependencies, placeholder = slot
+
+    failed = [errors[dep] for dep in sorted(dependencies) if dep in errors]
+    available = [frames[dep] for dep in sorted(dependencies) if frames[dep] is not None]
+    if failed and not available:
+        placeholder.error(failed[0])
+        return
+    if not available:
+        placeholder.write("Aucune donnée disponible pour cet indicateur.")
+        return
+
+    df_slot = pd.concat(available, ignore_index=True)
+    if topic == DERIVED_TOPIC:
+        df_slot = engine.compute_frame(df_slot)
+        df_slot = df_slot[df_slot["indicator_id"] == indicator_id]
+        if df_slot.empty:
+            if failed:
+                placeholder.error(failed[0])
+            else:
+                placeholder.write("Aucune donnée disponible pour cet indicateur.")
+            return
+
+    render_indicator(placeholder.container(), topic, indicator_id, indicator_name, df_slot, end_year)
+
+
 def EconomicAnalysisTab():
     st.title("📊 Analyse Approfondie des Facteurs Économiques Mondiaux")
 
     st.header("🌍 Carte des Pays Sélectionnés")
     
-    countries_data = wbdata.get_countries()
-    countries_df = pd.DataFrame(countries_data)[["id", "name"]].sort_values("name")
+    countries_df = load_countries()
     country_names = countries_df["name"].tolist()
 
     selected_countries = st.multiselect(
@@ -295,18 +565,21 @@ def EconomicAnalysisTab():
             'Selected': [1]*len(selected_countries) 
         })
 
-        fig_map = px.choropleth(
-            map_df,
-            locations="Country",
-            locationmode='country names',
-            color="Selected",
-            color_continuous_scale=["lightgrey", "#636EFA"],
-            hover_name="Country",
-            title="Pays Sélectionnés",
-            projection="natural earth"
+        fig_map = go.Figure(
+            go.Choropleth(
+                locations=map_df["Country"],
+                locationmode='country names',
+                z=map_df["Selected"],
+                colorscale=[[0, "lightgrey"], [1, "#636EFA"]],
+                zmin=0,
+                zmax=1,
+                hovertemplate="%{location}<extra></extra>"
+            )
         )
 
         fig_map.update_layout(
+            title_text="Pays Sélectionnés",
+            geo=dict(projection_type="natural earth"),
             height=600,
             coloraxis_showscale=False, 
             paper_bgcolor='rgba(0,0,0,0)',  
@@ -342,340 +615,459 @@ def EconomicAnalysisTab():
             "id"
         ].tolist()
 
-        all_indicators = []
-        for topic, indicators in grouped_indicators.items():
-            for ind_id, ind_name in indicators.items():
-                all_indicators.append((ind_id, ind_name))
-
-        all_indicators_dict = dict(all_indicators)
+        all_indicators_dict = all_indicators()
 
         date_range = (str(start_year), str(end_year))
 
-        with st.spinner('Récupération des données...'):
-            try:
-                df = fetch_data(
-                    indicators=all_indicators_dict,
-                    countries=selected_country_ids,
-                    date_range=date_range
-                )
-            except Exception as e:
-                st.error(f"Erreur lors de la récupération des données: {e}")
-                return
+        status = st.empty()
+        messages = st.container()
 
-        if df.empty:
-            st.error("Aucune donnée trouvée pour les paramètres sélectionnés.")
-            return
+        st.header("📈 Visualisation des Indicateurs Économiques")
 
-        df = df.reset_index()
+        # Lay out a placeholder for every chart up front. Each one is filled as
+        # soon as the indicators it needs have arrived, rather than once the
+        # whole panel has been fetched.
+        engine = load_derived_engine()
+        derived_names = {ind_id: definition["name"] for ind_id, definition in derived_indicators.items()}
+        plots_per_row = 2
+        pending = []
+        for topic, indicators in [*grouped_indicators.items(), (DERIVED_TOPIC, derived_names)]:
+            st.subheader(topic)
 
-        if "country" not in df.columns:
-            if len(selected_countries) == 1:
-                df["country"] = selected_countries[0]
-            else:
-                df["country"] = "Unknown"
-                st.warning("La colonne 'country' est manquante et a été remplie avec 'Unknown'.")
+            cols = []
+            for _ in range(0, len(indicators), plots_per_row):
+                cols.extend(st.columns(plots_per_row))
+
+            for col, (indicator_id, indicator_name) in zip(cols, indicators.items()):
+                if topic == DERIVED_TOPIC:
+                    dependencies = engine.dependencies(indicator_id)
+                elif indicator_id == "SP.POP.TOTL":
+                    dependencies = {indicator_id, "SP.POP.GROW"}
+                else:
+                    dependencies = {indicator_id}
+                placeholder = col.empty()
+                placeholder.caption("⏳ Chargement...")
+                pending.append((topic, indicator_id, indicator_name, dependencies, placeholder))
+
+        frames = {}
+        errors = {}
+        unmatched = set()
+        missing_country = False
+
+        # Fetches run in worker threads; every Streamlit call stays on the
+        # script thread, which renders the results in completion order.
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = {
+                executor.submit(fetch_data, {ind_id: ind_name}, selected_country_ids, date_range): ind_id
+                for ind_id, ind_name in all_indicators_dict.items()
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                ind_id = futures[future]
+                status.progress(done / len(futures), text=f"Récupération des données... ({done}/{len(futures)})")
+
+                try:
+                    df = future.result()
+                except Exception as e:
+                    errors[ind_id] = f"Erreur lors de la récupération des données: {e}"
+                    df = pd.DataFrame()
+
+                if df.empty:
+                    frames[ind_id] = None
+                else:
+                    df = df.reset_index()
+
+                    if "country" not in df.columns:
+                        if len(selected_countries) == 1:
+                            df["country"] = selected_countries[0]
+                        else:
+                            df["country"] = "Unknown"
+                            missing_country = True
+
+                    try:
+                        frames[ind_id], ind_unmatched = reshape_indicators(df)
+                        unmatched.update(ind_unmatched)
+                    except KeyError as e:
+                        errors[ind_id] = f"Erreur lors de la transformation des données: {e}"
+                        frames[ind_id] = None
+                    except ValueError:
+                        errors[ind_id] = "Conversion des dates en entiers a échoué. Veuillez vérifier les données."
+                        frames[ind_id] = None
+
+                ready = [slot for slot in pending if slot[3] <= frames.keys()]
+                for slot in ready:
+                    pending.remove(slot)
+                    render_slot(slot, frames, errors, engine, end_year)
+
+        status.empty()
+
+        for topic, indicator_id, indicator_name, dependencies, placeholder in pending:
+            placeholder.write("Aucune donnée disponible pour cet indicateur.")
+
+        if all(frame is None for frame in frames.values()):
+            messages.error("Aucune donnée trouvée pour les paramètres sélectionnés.")
+
+        if missing_country:
+            messages.warning("La colonne 'country' est manquante et a été remplie avec 'Unknown'.")
+
+        if unmatched:
+            messages.warning(f"Les indicateurs suivants n'ont pas été regroupés: {', '.join(unmatched)}")
+
+
+
+
+def DiagnosticsTab():
+    st.title("🧪 Diagnostics Statistiques")
+
+    countries_df = load_countries()
+    country_names = countries_df["name"].tolist()
+
+    selected_countries = st.multiselect(
+        "Choisissez un ou plusieurs pays :",
+        options=country_names,
+        default=["France", "United States"],
+        key="diagnostics_countries"
+    )
+
+    all_indicators_dict = all_indicators()
+
+    indicator_id = st.selectbox(
+        "Sélectionnez un indicateur :",
+        options=list(all_indicators_dict),
+        index=list(all_indicators_dict).index("NY.GDP.MKTP.CD"),
+        format_func=lambda ind_id: all_indicators_dict[ind_id],
+        key="diagnostics_indicator"
+    )
+
+    transformations = {
+        "Croissance logarithmique": "log",
+        "Croissance en pourcentage": "pct",
+        "Niveau": "level",
+    }
+    transformation = st.radio(
+        "Transformation :",
+        options=list(transformations),
+        horizontal=True,
+        key="diagnostics_transformation"
+    )
 
+    col_lags, col_lb, col_window = st.columns(3)
+    nlags = col_lags.number_input("Nombre de retards (ACF/PACF) :", min_value=1, max_value=40, value=20)
+    lb_lags = col_lb.number_input("Retards du test de Ljung-Box :", min_value=1, max_value=40, value=10)
+    window = col_window.number_input("Fenêtre glissante (années) :", min_value=2, max_value=20, value=4)
+
+    if not selected_countries:
+        st.write("Aucun pays sélectionné.")
+        return
+
+    selected_country_ids = countries_df.loc[
+        countries_df["name"].isin(selected_countries),
+        "id"
+    ].tolist()
+
+    indicator_name = all_indicators_dict[indicator_id]
+
+    with st.spinner('Récupération des données...'):
         try:
-            df_melted = df.melt(
-                id_vars=["country", "date"],
-                var_name="indicator",
-                value_name="value"
+            df = fetch_data(
+                indicators={indicator_id: indicator_name},
+                countries=selected_country_ids,
+                date_range=("1960", str(datetime.datetime.now().year))
             )
-        except KeyError as e:
-            st.error(f"Erreur lors de la transformation des données: {e}")
+        except Exception as e:
+            st.error(f"Erreur lors de la récupération des données: {e}")
             return
 
-        indicators_flat = []
-        for topic, indicators in grouped_indicators.items():
-            for ind_id, ind_name in indicators.items():
-                indicators_flat.append({
-                    "indicator_id": ind_id,
-                    "indicator_name": ind_name,
-                    "topic": topic
-                })
-        indicators_df = pd.DataFrame(indicators_flat)
-
-        df_merged = df_melted.merge(
-            indicators_df,
-            how="left",
-            left_on="indicator",
-            right_on="indicator_name"
+    if df.empty:
+        st.error("Aucune donnée trouvée pour les paramètres sélectionnés.")
+        return
+
+    df = df.reset_index()
+    if "country" not in df.columns:
+        df["country"] = selected_countries[0]
+
+    df["date"] = pd.to_numeric(df["date"], errors='coerce')
+    panel = df.dropna(subset=["date"]).pivot(index="date", columns="country", values=indicator_name).sort_index()
+    panel.index = panel.index.astype(int)
+
+    if transformations[transformation] != "level":
+        panel = diagnostics.growth_rates(panel, log=transformations[transformation] == "log")
+
+    panel = panel.dropna(how="all")
+    panel = panel.dropna(how="all", axis=1)
+    if len(panel) <= window:
+        st.warning("Pas assez d'observations pour calculer les diagnostics.")
+        return
+
+    results = compute_diagnostics(data_hash(panel), panel, int(nlags), int(lb_lags), int(window))
+
+    st.subheader("Statistiques Descriptives")
+    st.dataframe(results["summary"].join(results["ljung_box"]).round(4), use_container_width=True)
+
+    from plotly.subplots import make_subplots
+
+    fig_rolling = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=(f"Moyenne glissante ({window} ans)", f"Écart-type glissant ({window} ans)")
+    )
+    for country in panel.columns:
+        fig_rolling.add_trace(
+            go.Scatter(x=panel.index, y=panel[country], mode="lines", name=country, opacity=0.4),
+            row=1, col=1
+        )
+        fig_rolling.add_trace(
+            go.Scatter(
+                x=results["rolling"]["mean"].index,
+                y=results["rolling"]["mean"][country],
+                mode="lines",
+                name=f"{country} - Moyenne",
+                line=dict(width=2, dash="dash")
+            ),
+            row=1, col=1
+        )
+        fig_rolling.add_trace(
+            go.Scatter(
+                x=results["rolling"]["std"].index,
+                y=results["rolling"]["std"][country],
+                mode="lines",
+                name=f"{country} - Écart-type",
+                line=dict(width=2)
+            ),
+            row=1, col=2
         )
+    fig_rolling.update_layout(
+        template="plotly_white",
+        height=400,
+        margin=dict(r=0, t=80, l=0, b=80)
+    )
+    st.plotly_chart(fig_rolling, use_container_width=True, key="diagnostics_rolling_plot")
+
+    n_obs = results["summary"]["n_obs"]
+    fig_acf = make_subplots(rows=1, cols=2, subplot_titles=("ACF", "PACF"))
+    for col_idx, name in enumerate(["acf", "pacf"], start=1):
+        for country in results[name].columns:
+            fig_acf.add_trace(
+                go.Bar(
+                    x=results[name].index[1:],
+                    y=results[name][country].iloc[1:],
+                    name=f"{country} - {name.upper()}"
+                ),
+                row=1, col=col_idx
+            )
+        bound = 1.96 / (n_obs.min() ** 0.5)
+        fig_acf.add_hline(y=bound, line_dash="dash", line_color="lightblue", row=1, col=col_idx)
+        fig_acf.add_hline(y=-bound, line_dash="dash", line_color="lightblue", row=1, col=col_idx)
+    fig_acf.update_layout(
+        barmode='group',
+        template="plotly_white",
+        height=400,
+        margin=dict(r=0, t=80, l=0, b=80)
+    )
+    fig_acf.update_xaxes(title_text="Retard")
+    st.plotly_chart(fig_acf, use_container_width=True, key="diagnostics_acf_plot")
+
 
-        unmatched = df_merged[df_merged["topic"].isna()]["indicator"].unique()
-        if len(unmatched) > 0:
-            st.warning(f"Les indicateurs suivants n'ont pas été regroupés: {', '.join(unmatched)}")
+@st.cache_resource(max_entries=1, show_spinner=False)
+def load_cross_country_analytics(path, modified):
+    """
+    Precomputes the cross-country ranks, percentiles and correlations from the
+    full-world extract written by `export_data.py`, once per extract version
+    (`modified` is the file's modification time). Never fetches from the API.
+    """
+    df_merged = read_indicator_extract(path)
+
+    df_derived = load_derived_engine().compute_frame(df_merged)
+    if not df_derived.empty:
+        df_merged = pd.concat([df_merged, df_derived], ignore_index=True)
+
+    regions = {c["name"]: c["region"]["value"] for c in load_country_catalog() if c["region"]["value"] != "Aggregates"}
+    return CrossCountryAnalytics.from_frame(df_merged, regions, lower_is_better=rank_indicators)
+
+correlation_indicators = [
+    "NY.GDP.PCAP.CD",
+    "NY.GDP.MKTP.KD.ZG",
+    "FP.CPI.TOTL.ZG",
+    "SL.UEM.TOTL.NE.ZS",
+    "SP.DYN.LE00.IN",
+    "SI.POV.GINI",
+    "DRV.TRD.OPEN.GD.ZS",
+]
+
+def CrossCountryTab():
+    st.title("🌐 Comparaisons Internationales")
+
+    path = find_indicator_extract()
+    if path is None:
+        st.info(
+            "Les comparaisons s'appuient sur l'extraction mondiale des indicateurs, qui n'a pas encore été générée. "
+            "Lancez `python export_data.py --countries all` (par exemple chaque nuit) pour la créer."
+        )
+        return
 
+    modified = os.path.getmtime(path)
+    with st.spinner("Chargement de l'extraction mondiale..."):
         try:
-            df_merged["date"] = pd.to_numeric(df_merged["date"], errors='coerce').astype('Int64')
-        except ValueError:
-            st.error("Conversion des dates en entiers a échoué. Veuillez vérifier les données.")
+            analytics = load_cross_country_analytics(path, modified)
+        except Exception as e:
+            st.error(f"Erreur lors de la lecture de l'extraction {path}: {e}")
             return
 
-        df_merged = df_merged.dropna(subset=["date"])
+    st.caption(f"Extraction du {datetime.datetime.fromtimestamp(modified):%d/%m/%Y %H:%M} ({os.path.basename(path)})")
 
-        st.header("📈 Visualisation des Indicateurs Économiques")
+    if not analytics.indicator_ids:
+        st.error("Aucune donnée trouvée.")
+        return
 
-        for topic, indicators in grouped_indicators.items():
-            st.subheader(topic)
+    indicator_names = {
+        **all_indicators(),
+        **{ind_id: definition["name"] for ind_id, definition in derived_indicators.items()},
+    }
+
+    col_indicator, col_country = st.columns(2)
+    indicator_id = col_indicator.selectbox(
+        "Sélectionnez un indicateur :",
+        options=analytics.indicator_ids,
+        index=analytics.indicator_ids.index("NY.GDP.PCAP.CD") if "NY.GDP.PCAP.CD" in analytics.indicator_ids else 0,
+        format_func=lambda ind_id: indicator_names.get(ind_id, ind_id),
+        key="cross_indicator"
+    )
+    country = col_country.selectbox(
+        "Choisissez un pays :",
+        options=analytics.countries,
+        index=analytics.countries.index("France") if "France" in analytics.countries else 0,
+        key="cross_country"
+    )
+
+    available_years = analytics.available_years(indicator_id)
+    if not available_years:
+        st.write("Aucune donnée disponible pour cet indicateur.")
+        return
+    year = st.select_slider(
+        "Sélectionnez l'année :",
+        options=available_years,
+        value=available_years[-1],
+        key="cross_year"
+    )
+
+    st.header(f"📍 Position de {country} en {year}")
+    position = analytics.position(indicator_id, country, year)
+    if pd.isna(position["rank"]):
+        st.info(f"Aucune donnée pour {country} en {year}.")
+    else:
+        col_rank, col_pct, col_region_rank, col_region_pct = st.columns(4)
+        col_rank.metric("Rang mondial", f"{position['rank']:.0f} / {position['count']}")
+        col_pct.metric("Percentile mondial", f"{position['percentile']:.0f}")
+        col_region_rank.metric(
+            f"Rang régional ({position['region']})",
+            f"{position['region_rank']:.0f} / {position['region_count']}"
+        )
+        col_region_pct.metric("Percentile régional", f"{position['region_percentile']:.0f}")
+
+    history = analytics.rank_history(indicator_id, country)
+    if not history.empty:
+        fig_history = go.Figure()
+        fig_history.add_trace(go.Scatter(x=history.index, y=history["percentile"], mode="lines+markers", name="Monde"))
+        fig_history.add_trace(go.Scatter(
+            x=history.index, y=history["region_percentile"], mode="lines+markers", name=position["region"]
+        ))
+        fig_history.update_layout(
+            title_text=f"Percentile de {country} – {indicator_names.get(indicator_id, indicator_id)}",
+            xaxis_title="Année",
+            yaxis=dict(title="Percentile", range=[0, 105]),
+            template="plotly_white",
+            height=400,
+            margin=dict(r=0, t=80, l=0, b=80)
+        )
+        st.plotly_chart(fig_history, use_container_width=True, key="cross_history_plot")
+
+    st.header("🏆 Classement")
+    regions = sorted(set(analytics.regions))
+    region = st.selectbox("Zone :", options=["Monde", *regions], key="cross_region")
+    ranking = analytics.ranking(indicator_id, year, region=None if region == "Monde" else region)
+    st.dataframe(
+        ranking.rename(columns={
+            "country": "Pays",
+            "region": "Région",
+            "value": "Valeur",
+            "rank": "Rang mondial",
+            "percentile": "Percentile mondial",
+            "region_rank": "Rang régional",
+            "region_percentile": "Percentile régional",
+        }).round(2),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    st.header("🔗 Corrélations entre Indicateurs")
+    selected_indicators = st.multiselect(
+        "Indicateurs :",
+        options=analytics.indicator_ids,
+        default=[ind_id for ind_id in correlation_indicators if ind_id in analytics.indicator_ids],
+        format_func=lambda ind_id: indicator_names.get(ind_id, ind_id),
+        key="cross_correlation_indicators"
+    )
+    pooled = st.radio(
+        "Observations :",
+        options=[f"Pays en {year}", "Toutes les années"],
+        horizontal=True,
+        key="cross_correlation_scope"
+    ) == "Toutes les années"
+
+    if len(selected_indicators) < 2:
+        st.write("Sélectionnez au moins deux indicateurs.")
+        return
+
+    corr = analytics.correlation(selected_indicators, year=None if pooled else year)
+    labels = [indicator_names.get(ind_id, ind_id) for ind_id in selected_indicators]
+    fig_corr = go.Figure(go.Heatmap(
+        z=corr.to_numpy(),
+        x=selected_indicators,
+        y=selected_indicators,
+        customdata=[[(row, col) for col in labels] for row in labels],
+        zmin=-1,
+        zmax=1,
+        colorscale="RdBu",
+        text=corr.round(2).to_numpy(),
+        texttemplate="%{text}",
+        hovertemplate="%{customdata[0]}<br>%{customdata[1]}<br>r = %{z:.2f}<extra></extra>"
+    ))
+    fig_corr.update_layout(
+        template="plotly_white",
+        height=600,
+        yaxis=dict(autorange="reversed"),
+        margin=dict(r=0, t=40, l=0, b=80)
+    )
+    st.plotly_chart(fig_corr, use_container_width=True, key="cross_correlation_plot")
+
+
+class ReleaseNotFound(Exception):
+    """
+    No WEO release could be found. Raised rather than returned so that
+    Streamlit does not cache the failure.
+    """
+
+    def __init__(self, failures):
+        super().__init__("No WEO release found")
+        self.failures = failures
+
+@st.cache_data(ttl=datetime.timedelta(days=1), show_spinner=False)
+def find_latest_release(year, desired_release_month):
+    """
+    Cached wrapper around `find_latest_weo_release`. Only successful lookups
+    are cached, so a failed download is retried on the next run.
+    """
+    filename, release, failures = find_latest_weo_release(year, desired_release_month)
+    if filename is None:
+        raise ReleaseNotFound(failures)
+    return filename, release, failures
 
-            df_topic = df_merged[df_merged["topic"] == topic]
-
-            if df_topic.empty:
-                st.write(f"Aucune donnée disponible pour le sujet '{topic}'.")
-                continue
-
-            topic_indicators_df = df_topic[['indicator', 'indicator_id', 'indicator_name']].drop_duplicates()
-
-            plots_per_row = 2
-            num_plots = len(topic_indicators_df)
-            rows = (num_plots + plots_per_row - 1) // plots_per_row 
-
-            for row in range(rows):
-                cols = st.columns(plots_per_row)
-                for idx, col in enumerate(cols):
-                    plot_idx = row * plots_per_row + idx
-                    if plot_idx >= num_plots:
-                        break
-                    indicator_id = topic_indicators_df.iloc[plot_idx]['indicator_id']
-                    indicator_name = topic_indicators_df.iloc[plot_idx]['indicator_name']
-
-                    if indicator_id == "SP.POP.TOTL":
-                        pop_growth_id = "SP.POP.GROW"
-                        pop_growth_name = grouped_indicators[topic].get(pop_growth_id, "Population growth")
-
-                        df_pop_total = df_topic[df_topic["indicator_id"] == indicator_id]
-                        df_pop_growth = df_topic[df_topic["indicator_id"] == pop_growth_id]
-
-                        if df_pop_growth.empty:
-                            col.warning(f"L'indicateur de croissance de la population '{pop_growth_name}' est manquant.")
-                            continue
-
-                        df_combined = pd.merge(
-                            df_pop_total[['country', 'date', 'value']],
-                            df_pop_growth[['country', 'date', 'value']],
-                            on=['country', 'date'],
-                            suffixes=('_total', '_growth')
-                        )
-
-                        gdp_pivot_total = df_combined.pivot(index="date", columns="country", values="value_total")
-                        gdp_pivot_growth = df_combined.pivot(index="date", columns="country", values="value_growth")
-
-                        countries_with_no_data_total = gdp_pivot_total.columns[gdp_pivot_total.isna().all()].tolist()
-                        countries_with_no_data_growth = gdp_pivot_growth.columns[gdp_pivot_growth.isna().all()].tolist()
-                        countries_with_no_data = list(set(countries_with_no_data_total + countries_with_no_data_growth))
-
-                        gdp_pivot_total = gdp_pivot_total.drop(columns=countries_with_no_data, errors='ignore')
-                        gdp_pivot_growth = gdp_pivot_growth.drop(columns=countries_with_no_data, errors='ignore')
-
-                        if countries_with_no_data:
-                            col.info(f"Pour les indicateurs 'Population, total' et 'Population growth', les pays suivants ont été exclus en raison de l'absence de données : {', '.join(countries_with_no_data)}.")
-
-                        if gdp_pivot_total.empty and gdp_pivot_growth.empty:
-                            col.write("Aucune donnée disponible pour les pays sélectionnés après exclusion des pays sans données.")
-                            continue
-
-                        earliest_year_total = gdp_pivot_total.dropna().index.min() if not gdp_pivot_total.empty else None
-                        earliest_year_growth = gdp_pivot_growth.dropna().index.min() if not gdp_pivot_growth.empty else None
-                        earliest_year = min(filter(None, [earliest_year_total, earliest_year_growth]))
-                        latest_year = max(
-                            gdp_pivot_total.dropna().index.max() if not gdp_pivot_total.empty else 0,
-                            gdp_pivot_growth.dropna().index.max() if not gdp_pivot_growth.empty else 0
-                        )
-
-                        fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-                        if not gdp_pivot_total.empty:
-                            for country in gdp_pivot_total.columns:
-                                fig.add_trace(
-                                    go.Bar(
-                                        x=gdp_pivot_total.index,
-                                        y=gdp_pivot_total[country],
-                                        name=f"{country} - Population Totale",
-                                        opacity=0.6
-                                    ),
-                                    secondary_y=False,
-                                )
-
-                        if not gdp_pivot_growth.empty:
-                            for country in gdp_pivot_growth.columns:
-                                fig.add_trace(
-                                    go.Scatter(
-                                        x=gdp_pivot_growth.index,
-                                        y=gdp_pivot_growth[country],
-                                        mode="lines",
-                                        name=f"{country} - Croissance de la Population",
-                                        line=dict(width=2),
-                                        hovertemplate='%{y}%'
-                                    ),
-                                    secondary_y=True,
-                                )
-
-                        fig.update_layout(
-                            title_text="Population Totale et Croissance de la Population",
-                            legend=dict(
-                                orientation="h",
-                                yanchor="bottom",
-                                y=1.02,  
-                                xanchor="center",
-                                x=0.5
-                            ),
-                            template="plotly_white",
-                            height=600,
-                            margin=dict(r=50, t=100, l=50, b=80)
-                        )
-
-                        fig.update_yaxes(title_text="Population Totale", secondary_y=False)
-                        fig.update_yaxes(title_text="Croissance de la Population (%)", secondary_y=True)
-
-                        fig.update_xaxes(range=[earliest_year, end_year], dtick=2, title_text="Année")
-
-                        col.plotly_chart(fig, use_container_width=True, key="combined_population_plot")
-
-                        col.markdown(
-                            """
-                            **Population Totale et Croissance de la Population**
-
-                            - **Population Totale**: Représente le nombre total d'habitants dans un pays à un moment donné. C'est une mesure clé de la taille démographique et a des implications sur le marché du travail, la demande de biens et services, et la planification des infrastructures.
-
-                            - **Croissance de la Population**: Indique le taux auquel la population d'un pays augmente ou diminue chaque année. Une croissance positive peut signaler une expansion économique potentielle mais aussi des défis en termes de ressources et de services publics. Une croissance négative peut indiquer un vieillissement de la population ou des défis démographiques.
-                            """
-                        )
-                        continue  
-
-                    if indicator_id in rank_indicators:
-                        plot_type = "bar"
-                    else:
-                        plot_type = "line"
-
-                    df_ind = df_topic[df_topic["indicator_id"] == indicator_id]
-
-                    gdp_pivot = df_ind.pivot(index="date", columns="country", values="value")
-
-                    countries_with_no_data = gdp_pivot.columns[gdp_pivot.isna().all()].tolist()
-
-                    gdp_pivot = gdp_pivot.drop(columns=countries_with_no_data, errors='ignore')
-
-                    if countries_with_no_data:
-                        col.info(f"Pour l'indicateur '{indicator_name}', les pays suivants ont été exclus en raison de l'absence de données : {', '.join(countries_with_no_data)}.")
-
-                    if gdp_pivot.empty:
-                        col.write("Aucune donnée disponible pour les pays sélectionnés après exclusion des pays sans données.")
-                        continue
-
-                    years_with_data = gdp_pivot.index[gdp_pivot.notna().any(axis=1)].tolist()
-
-                    gdp_pivot_filtered = gdp_pivot.loc[years_with_data]
-
-                    earliest_year = gdp_pivot_filtered.index.min()
-
-                    fig = go.Figure()
-
-                    if plot_type == "bar":
-                        for country in gdp_pivot_filtered.columns:
-                            fig.add_trace(
-                                go.Bar(
-                                    x=gdp_pivot_filtered.index,
-                                    y=gdp_pivot_filtered[country],
-                                    name=country
-                                )
-                            )
-                        fig.update_layout(
-                            yaxis_title=indicator_name,
-                            barmode='group',
-                            title={
-                                'text': indicator_name,
-                                'y':0.95,
-                                'x':0.5,
-                                'xanchor': 'center',
-                                'yanchor': 'top'
-                            },
-                            xaxis=dict(
-                                categoryorder='category ascending',
-                                tickmode='array',
-                                tickvals=years_with_data,
-                                ticktext=[str(year) for year in years_with_data],
-                                title_text="Année"
-                            ),
-                            legend=dict(
-                                orientation="h",
-                                yanchor="bottom",
-                                y=1.02,  
-                                xanchor="center",
-                                x=0.5
-                            ),
-                            template="plotly_white",
-                            height=400,
-                            margin=dict(r=0, t=80, l=0, b=80)
-                        )
-                    else:
-                        for country in gdp_pivot_filtered.columns:
-                            fig.add_trace(
-                                go.Scatter(
-                                    x=gdp_pivot_filtered.index,
-                                    y=gdp_pivot_filtered[country],
-                                    mode="lines",
-                                    name=country,
-                                    line=dict(width=2)
-                                )
-                            )
-                        fig.update_layout(
-                            yaxis_title=indicator_name,
-                            title={
-                                'text': indicator_name,
-                                'y':0.95,
-                                'x':0.5,
-                                'xanchor': 'center',
-                                'yanchor': 'top'
-                            },
-                            xaxis=dict(
-                                range=[earliest_year, end_year],
-                                dtick=2, 
-                                title_text="Année"
-                            ),
-                            legend=dict(
-                                orientation="h",
-                                yanchor="bottom",
-                                y=1.02, 
-                                xanchor="center",
-                                x=0.5
-                            ),
-                            template="plotly_white",
-                            height=400,
-                            margin=dict(r=0, t=80, l=0, b=80)
-                        )
-
-                    fig.update_layout(
-                        legend_title_text="Pays",
-                        xaxis_title="Année",
-                        yaxis_title=indicator_name,
-                        template="plotly_white",
-                        height=400,
-                        legend=dict(
-                            orientation="h",
-                            yanchor="bottom",
-                            y=1.02,
-                            xanchor="center",
-                            x=0.5
-                        ),
-                        margin=dict(r=0, t=80, l=0, b=80)
-                    )
-
-                    sanitized_topic = sanitize_key(topic)
-                    sanitized_indicator = sanitize_key(indicator_name)
-                    plot_key = f"plot_{sanitized_topic}_{sanitized_indicator}"
-
-                    col.plotly_chart(fig, use_container_width=True, key=plot_key)
-
-                    description = indicator_descriptions.get(indicator_id, "Description non disponible pour cet indicateur.")
-                    col.markdown(
-                        f"""
-                        **{indicator_name}**
-
-                        {description}
-                        """
-                    )
+@st.cache_resource
+def load_weo(filename):
+    """
+    Parses a downloaded WEO file once per process.
+    """
+    import weo
 
+    return weo.WEO(filename)
 
 def ProjectionsTab():
     st.title("🔮 Projections Économiques")
@@ -683,24 +1075,16 @@ def ProjectionsTab():
     st.header("📥 Téléchargement des Données du World Economic Outlook (WEO)")
 
     current_year = datetime.datetime.now().year
-    current_month = datetime.datetime.now().month
     desired_release_month = 10  
 
-    def find_latest_release(year, desired_month):
-        for month_offset in range(0, desired_release_month):
-            release_month = desired_release_month - month_offset
-            try:
-                release_date = datetime.datetime(year, release_month, 1)
-                release_str = release_date.strftime('%b')
-                filename = f'weo_{year}_{release_str}.csv'
-                weo.download(year=year, release=release_str, filename=filename)  
-                return filename, release_str
-            except Exception as e:
-                st.warning(f"Échec du téléchargement pour {release_str} {year}: {e}")
-                continue
-        return None, None
-
-    filename, release = find_latest_release(current_year, desired_release_month)
+    with st.spinner('Téléchargement des données WEO...'):
+        try:
+            filename, release, failures = find_latest_release(current_year, desired_release_month)
+        except ReleaseNotFound as e:
+            filename, release, failures = None, None, e.failures
+
+    for failed_release, error in failures:
+        st.warning(f"Échec du téléchargement pour {failed_release} {current_year}: {error}")
 
     if filename and release:
         st.success(f"Données WEO téléchargées avec succès: {filename} (Release: {release})")
@@ -711,7 +1095,7 @@ def ProjectionsTab():
     st.header("📊 Sélection du Pays pour les Projections")
 
     try:
-        weo_data = weo.WEO(filename)
+        weo_data = load_weo(filename)
     except Exception as e:
         st.error(f"Erreur lors du chargement des données WEO: {e}")
         return
@@ -742,31 +1126,18 @@ def ProjectionsTab():
         st.error(f"Erreur lors de l'extraction des données pour le pays {selected_country}: {e}")
         return
 
-    df = pd.DataFrame()
-
     try:
-        df["GDP"] = (c.NGDP_RPCH.dropna() / 100 + 1).cumprod() * 100
-        df["CPI"] = c.PCPIPCH
-        df["FX"] = c.NGDP / c.NGDPD
-        df["DEFICIT"] = (c.GGR - c.GGX) / c.NGDP * 100
-        df["CA"] = c.BCA / c.NGDPD * 100
-
-        df["_GDEBT"] = (c.GGXWDG / c.NGDP) * 100
-        df["_NDEBT"] = (c.GGXWDN / c.NGDP) * 100
+        df = weo_projection_frame(c)
     except AttributeError as e:
         st.error(f"Erreur lors de l'accès aux attributs des données WEO: {e}")
         return
 
-    if isinstance(df.index, pd.PeriodIndex):
-        df.index = df.index.to_timestamp()
-
-    elif not pd.api.types.is_datetime64_any_dtype(df.index):
-        df.index = df.index.astype(str)
-
     st.subheader(f"Projections Économiques pour {selected_country}")
 
     st.write(df)
 
+    from plotly.subplots import make_subplots
+
     fig = make_subplots(
         rows=3, cols=3,
         vertical_spacing=0.1,
@@ -878,14 +1249,64 @@ def ProjectionsTab():
 
     st.plotly_chart(fig, use_container_width=True)
 
+    st.header(f"🤖 Prévisions des Modèles pour {selected_country}")
+
+    forecast_indicator = st.selectbox(
+        "Sélectionnez un indicateur :",
+        options=list(DEFAULT_INDICATORS),
+        format_func=lambda ind_id: DEFAULT_INDICATORS[ind_id],
+    )
+
+    forecasts = load_model_forecasts(country_ISO, forecast_indicator)
+
+    if forecasts.empty:
+        st.info(
+            f"Aucune prévision précalculée pour {selected_country}. "
+            f"Lancez `python model_registry.py --countries {country_ISO}` pour entraîner les modèles."
+        )
+        return
+
+    fig_forecast = go.Figure()
+    for model_name, df_model in forecasts.groupby("model"):
+        fig_forecast.add_trace(
+            go.Scatter(
+                x=df_model["year"],
+                y=df_model["forecast"],
+                mode="lines+markers",
+                name=model_name.upper(),
+                line=dict(width=2, dash="dash")
+            )
+        )
+
+    fig_forecast.update_layout(
+        title_text=DEFAULT_INDICATORS[forecast_indicator],
+        xaxis_title="Année",
+        template="plotly_white",
+        height=400,
+        margin=dict(r=0, t=80, l=0, b=80)
+    )
+
+    st.plotly_chart(fig_forecast, use_container_width=True, key="model_forecasts_plot")
+
 def main():
-    tabs = st.tabs(["🔍 Analyse Économique", "🔮 Projections"])
+    pages = {
+        "🔍 Analyse Économique": EconomicAnalysisTab,
+        "🧪 Diagnostics": DiagnosticsTab,
+        "🌐 Comparaisons": CrossCountryTab,
+        "🔮 Projections": ProjectionsTab,
+    }
 
-    with tabs[0]:
-        EconomicAnalysisTab()
+    # Only the selected page runs, so tab-specific data (e.g. the WEO download)
+    # is loaded the first time the user opens that page rather than at startup.
+    page = st.radio(
+        "Navigation",
+        options=list(pages),
+        horizontal=True,
+        label_visibility="collapsed",
+        key="page"
+    )
 
-    with tabs[1]:
-        ProjectionsTab()
+    pages[page]()
 
 if __name__ == "__main__":
     main()
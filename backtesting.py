@@ -0,0 +1,173 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import forecasting
+
+
+def rolling_origins(n_obs, min_train, step=1):
+    """
+    Returns the forecast origins of a rolling-origin evaluation, as the number
+    of observations available for training at each origin.
+    """
+    if min_train >= n_obs:
+        raise ValueError(f"min_train ({min_train}) must be smaller than the series length ({n_obs}).")
+    return list(range(min_train, n_obs, step))
+
+
+def refit_blocks(origins, refit_every):
+    """
+    Splits the origins into consecutive blocks of `refit_every` origins. A model
+    is fitted from scratch at the first origin of every block, so the refit
+    schedule does not depend on how the blocks are spread over processes.
+    """
+    if refit_every < 1:
+        raise ValueError(f"refit_every must be at least 1, got {refit_every}.")
+    return [origins[i:i + refit_every] for i in range(0, len(origins), refit_every)]
+
+
+def _errors(values, origin, forecast):
+    """
+    Pairs a forecast made at `origin` with the realised values, dropping the
+    horizons that fall beyond the end of the series.
+    """
+    actual = values[origin:origin + len(forecast)]
+    forecast = np.asarray(forecast)[:len(actual)]
+    return pd.DataFrame({
+        "origin": origin,
+        "horizon": np.arange(1, len(actual) + 1),
+        "forecast": forecast,
+        "actual": actual,
+        "error": forecast - actual,
+    })
+
+
+def _backtest_arima_chunk(values, blocks, horizon, order):
+    """
+    Fits ARIMA at the first origin of each block, then moves the origin forward
+    by appending the new observations to the fitted state (parameters unchanged).
+    """
+    frames = []
+    for block in blocks:
+        results = forecasting.fit_arima(values[:block[0]], order=order)
+        last_origin = block[0]
+        for origin in block:
+            if origin != last_origin:
+                results = results.append(values[last_origin:origin], refit=False)
+                last_origin = origin
+            frames.append(_errors(values, origin, forecasting.forecast_arima(results, horizon)))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _backtest_lstm_chunk(values, blocks, horizon, lookback, n_epochs, warm_epochs, seed):
+    """
+    Trains an LSTM fully at the first origin of each block, then warm-starts
+    each following origin of the block from the previous weights with a
+    shorter training budget.
+    """
+    import torch
+
+    # One intra-op thread per worker: the parallelism comes from the processes,
+    # and a fixed thread count keeps the results identical for any n_jobs.
+    num_threads = torch.get_num_threads()
+    torch.set_num_threads(1)
+    try:
+        frames = []
+        for block in blocks:
+            torch.manual_seed(seed)
+            model = None
+            for origin in block:
+                model, scaler = forecasting.fit_lstm(
+                    values[:origin],
+                    lookback=lookback,
+                    n_epochs=n_epochs if model is None else warm_epochs,
+                    model=model,
+                )
+                forecast = forecasting.forecast_lstm(model, scaler, values[:origin], horizon, lookback=lookback)
+                frames.append(_errors(values, origin, forecast))
+    finally:
+        torch.set_num_threads(num_threads)
+    return pd.concat(frames, ignore_index=True)
+
+
+def backtest(values, model="arima", horizon=4, min_train=20, step=1, n_jobs=None,
+             order=(1, 0, 1), refit_every=10, lookback=3, n_epochs=2000, warm_epochs=200,
+             seed=0):
+    """
+    Walk-forward backtest of `model` ("arima" or "lstm") on a univariate series.
+
+    The model is fitted from scratch every `refit_every` origins and updated
+    incrementally in between. These refit blocks are spread over `n_jobs`
+    parallel processes; since every block starts with a fresh fit, the results
+    do not depend on `n_jobs`.
+
+    Returns a long frame (origin, horizon, forecast, actual, error), where
+    `origin` is the number of observations used for training.
+    """
+    values = np.asarray(values, dtype=float)
+    origins = rolling_origins(len(values), min_train, step)
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    blocks = refit_blocks(origins, refit_every)
+    n_chunks = min(n_jobs, len(blocks))
+    chunks = [blocks[i * len(blocks) // n_chunks:(i + 1) * len(blocks) // n_chunks] for i in range(n_chunks)]
+
+    if model == "arima":
+        jobs = [(_backtest_arima_chunk, (values, chunk, horizon, order)) for chunk in chunks]
+    elif model == "lstm":
+        jobs = [(_backtest_lstm_chunk, (values, chunk, horizon, lookback, n_epochs, warm_epochs, seed)) for chunk in chunks]
+    else:
+        raise ValueError(f"Unknown model: {model}")
+
+    if len(jobs) == 1:
+        frames = [func(*args) for func, args in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = [executor.submit(func, *args) for func, args in jobs]
+            frames = [future.result() for future in futures]
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize(errors):
+    """
+    Aggregates backtest errors into RMSE and MAE per forecast horizon.
+    """
+    grouped = errors.groupby("horizon")["error"]
+    return pd.DataFrame({
+        "RMSE": np.sqrt(grouped.apply(lambda e: np.mean(e ** 2))),
+        "MAE": grouped.apply(lambda e: np.mean(np.abs(e))),
+        "n_origins": grouped.size(),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the forecasting models.")
+    parser.add_argument("--country", required=True, help="ISO3 country code, e.g. FRA")
+    parser.add_argument("--indicator", default="NY.GDP.MKTP.KD.ZG", help="World Bank indicator id")
+    parser.add_argument("--models", nargs="+", default=["arima", "lstm"], choices=["arima", "lstm"])
+    parser.add_argument("--horizon", type=int, default=4)
+    parser.add_argument("--min-train", type=int, default=20)
+    parser.add_argument("--step", type=int, default=1)
+    parser.add_argument("--refit-every", type=int, default=10, help="Origins between two fits from scratch")
+    parser.add_argument("--jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    import wbdata
+
+    series = wbdata.get_series(args.indicator, country=args.country).dropna().sort_index()
+
+    for model in args.models:
+        errors = backtest(
+            series.values, model=model, horizon=args.horizon,
+            min_train=args.min_train, step=args.step, refit_every=args.refit_every, n_jobs=args.jobs,
+        )
+        print(f"{model.upper()} - {args.country} {args.indicator}")
+        print(summarize(errors).round(4))
+        print()
+
+
+if __name__ == "__main__":
+    main()
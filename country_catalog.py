@@ -0,0 +1,70 @@
+import datetime
+import json
+import os
+import threading
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "countries.json")
+
+MAX_AGE_DAYS = 30
+
+_refresh_lock = threading.Lock()
+
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    """
+    Reads the bundled country catalog snapshot.
+    Returns (countries, updated_at).
+    """
+    with open(path, encoding="utf-8") as f:
+        snapshot = json.load(f)
+    return snapshot["countries"], datetime.datetime.fromisoformat(snapshot["updated_at"])
+
+
+def refresh_snapshot(path=SNAPSHOT_PATH):
+    """
+    Downloads the country catalog from the World Bank API and rewrites the snapshot.
+    Returns the number of countries written.
+    """
+    import wbdata
+
+    countries = [
+        {"id": c["id"], "name": c["name"], "region": {"id": c["region"]["id"], "value": c["region"]["value"]}}
+        for c in wbdata.get_countries(skip_cache=True)
+    ]
+    snapshot = {
+        "updated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "countries": sorted(countries, key=lambda c: c["id"]),
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=1, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return len(countries)
+
+
+def _refresh_in_background(path):
+    if not _refresh_lock.acquire(blocking=False):
+        return
+    try:
+        refresh_snapshot(path)
+    except Exception:
+        # Offline or API error: keep serving the existing snapshot.
+        pass
+    finally:
+        _refresh_lock.release()
+
+
+def load_country_catalog(path=SNAPSHOT_PATH, max_age_days=MAX_AGE_DAYS):
+    """
+    Returns the country catalog from the local snapshot without touching the
+    network. If the snapshot is older than `max_age_days`, a refresh is started
+    in a background thread and picked up on a later load.
+    """
+    countries, updated_at = read_snapshot(path)
+    if datetime.datetime.now() - updated_at > datetime.timedelta(days=max_age_days):
+        threading.Thread(target=_refresh_in_background, args=(path,), daemon=True).start()
+    return countries
+
+
+if __name__ == "__main__":
+    print(f"Wrote {refresh_snapshot()} countries to {SNAPSHOT_PATH}")
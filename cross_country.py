@@ -0,0 +1,224 @@
+import numpy as np
+import pandas as pd
+
+
+def rank(values, axis=1, ascending=False):
+    """
+    Ranks `values` along `axis`, 1 being the largest value (the smallest if
+    `ascending`). Ties get the average of their ranks and missing values stay
+    NaN, as `pandas.DataFrame.rank` does. Every other axis is ranked
+    independently in a single pass.
+    """
+    values = np.moveaxis(np.asarray(values, dtype=float), axis, -1)
+    if not ascending:
+        values = -values
+    n = values.shape[-1]
+
+    # argsort puts NaNs last; ranks are computed on the sorted values and
+    # scattered back to the original positions.
+    order = np.argsort(values, axis=-1, kind="stable")
+    sorted_values = np.take_along_axis(values, order, axis=-1)
+    position = np.broadcast_to(np.arange(n), values.shape)
+
+    starts_group = np.ones(values.shape, dtype=bool)
+    starts_group[..., 1:] = sorted_values[..., 1:] != sorted_values[..., :-1]
+    ends_group = np.ones(values.shape, dtype=bool)
+    ends_group[..., :-1] = starts_group[..., 1:]
+
+    first = np.maximum.accumulate(np.where(starts_group, position, 0), axis=-1)
+    last = np.minimum.accumulate(np.where(ends_group, position, n - 1)[..., ::-1], axis=-1)[..., ::-1]
+    sorted_ranks = (first + last) / 2 + 1
+    sorted_ranks[np.isnan(sorted_values)] = np.nan
+
+    ranks = np.empty(values.shape)
+    np.put_along_axis(ranks, order, sorted_ranks, axis=-1)
+    return np.moveaxis(ranks, -1, axis)
+
+
+def group_rank(values, groups, axis=1, ascending=False):
+    """
+    Ranks `values` along `axis` within each group, `groups` giving the group
+    label of every position along that axis.
+    Returns (ranks, counts), `counts` being the number of non-missing values
+    in the group each position belongs to.
+    """
+    values = np.asarray(values, dtype=float)
+    groups = np.asarray(groups)
+    ranks = np.full(values.shape, np.nan)
+    counts = np.zeros(values.shape)
+    for group in np.unique(groups):
+        members = np.flatnonzero(groups == group)
+        subset = np.take(values, members, axis=axis)
+        index = [slice(None)] * values.ndim
+        index[axis] = members
+        ranks[tuple(index)] = rank(subset, axis=axis, ascending=ascending)
+        counts[tuple(index)] = np.sum(~np.isnan(subset), axis=axis, keepdims=True)
+    return ranks, counts
+
+
+def percentile(ranks, counts):
+    """
+    Percentile of every ranked value within its group: 100 for the best
+    value, (100 / n) for the worst.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (counts + 1 - ranks) / counts * 100
+
+
+def correlation_matrix(values, min_periods=3):
+    """
+    Pearson correlations between the variables of `values`, shaped
+    (..., n_variables, n_observations), using every pair of observations where
+    both variables are present (as `pandas.DataFrame.corr` does). Leading
+    axes are batched. Pairs with fewer than `min_periods` common observations
+    are NaN.
+    """
+    values = np.asarray(values, dtype=float)
+
+    # Correlations are invariant to shifting and scaling each variable, so
+    # standardize first to keep the sums of squares well conditioned.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.nanmean(values, axis=-1, keepdims=True)
+        scale = np.nanstd(values, axis=-1, keepdims=True)
+        values = (values - mean) / np.where(scale > 0, scale, 1)
+
+    present = (~np.isnan(values)).astype(float)
+    x = np.nan_to_num(values)
+    present_t = np.swapaxes(present, -1, -2)
+
+    n = present @ present_t
+    sum_x = x @ present_t
+    sum_y = np.swapaxes(sum_x, -1, -2)
+    sum_xx = (x ** 2) @ present_t
+    sum_yy = np.swapaxes(sum_xx, -1, -2)
+    sum_xy = x @ np.swapaxes(x, -1, -2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sum_xy - sum_x * sum_y / n
+        var_x = sum_xx - sum_x ** 2 / n
+        var_y = sum_yy - sum_y ** 2 / n
+        corr = cov / np.sqrt(var_x * var_y)
+    corr = np.clip(corr, -1, 1)
+    corr[(n < max(min_periods, 2)) | ~np.isfinite(corr)] = np.nan
+    return corr
+
+
+class CrossCountryAnalytics:
+    """
+    Precomputed cross-country statistics over an (indicator x country x year)
+    cube: world and regional ranks and percentiles for every indicator and
+    year, and correlation matrices between indicators across countries.
+
+    Everything is computed once in the constructor, so the query methods only
+    index into arrays.
+    """
+
+    def __init__(self, cube, indicator_ids, countries, years, regions, lower_is_better=()):
+        self.cube = np.asarray(cube, dtype=float)
+        self.indicator_ids = list(indicator_ids)
+        self.countries = list(countries)
+        self.years = list(years)
+        self.regions = np.asarray(regions, dtype=object)
+        self._indicator_pos = {ind_id: i for i, ind_id in enumerate(self.indicator_ids)}
+        self._country_pos = {country: i for i, country in enumerate(self.countries)}
+        self._year_pos = {year: i for i, year in enumerate(self.years)}
+
+        # Flip the indicators where a lower value is better (e.g. Doing
+        # Business ranks) so that rank 1 is always the best performer.
+        sign = np.where(np.isin(self.indicator_ids, list(lower_is_better)), -1.0, 1.0)[:, None, None]
+        oriented = self.cube * sign
+
+        self.ranks = rank(oriented, axis=1)
+        self.counts = np.broadcast_to(np.sum(~np.isnan(self.cube), axis=1, keepdims=True), self.cube.shape)
+        self.percentiles = percentile(self.ranks, self.counts)
+        self.region_ranks, self.region_counts = group_rank(oriented, self.regions, axis=1)
+        self.region_percentiles = percentile(self.region_ranks, self.region_counts)
+
+        # (year x indicator x indicator) correlations across countries, plus
+        # one matrix pooling every country-year.
+        self.correlations = correlation_matrix(np.moveaxis(self.cube, 2, 0))
+        self.pooled_correlation = correlation_matrix(self.cube.reshape(len(self.indicator_ids), -1))
+
+    @classmethod
+    def from_frame(cls, df_merged, regions, lower_is_better=()):
+        """
+        Builds the analytics from a long indicator frame (as produced by
+        `economic_data.reshape_indicators`), `regions` mapping country names to
+        their region. Countries missing from `regions` are left out.
+        """
+        from economic_data import indicator_cube
+
+        df_merged = df_merged[df_merged["country"].isin(list(regions))]
+        cube, indicator_ids, countries, years = indicator_cube(df_merged)
+        return cls(cube, indicator_ids, countries, years, [regions[c] for c in countries], lower_is_better)
+
+    def available_years(self, indicator_id):
+        """
+        Years with at least one value for `indicator_id`.
+        """
+        has_data = np.any(~np.isnan(self.cube[self._indicator_pos[indicator_id]]), axis=0)
+        return [year for year, present in zip(self.years, has_data) if present]
+
+    def position(self, indicator_id, country, year):
+        """
+        World and regional rank and percentile of `country` for one indicator
+        and year. Ranks are NaN if the country has no value.
+        """
+        i = self._indicator_pos[indicator_id]
+        c = self._country_pos[country]
+        t = self._year_pos[year]
+        return {
+            "value": self.cube[i, c, t],
+            "rank": self.ranks[i, c, t],
+            "count": int(self.counts[i, c, t]),
+            "percentile": self.percentiles[i, c, t],
+            "region": self.regions[c],
+            "region_rank": self.region_ranks[i, c, t],
+            "region_count": int(self.region_counts[i, c, t]),
+            "region_percentile": self.region_percentiles[i, c, t],
+        }
+
+    def ranking(self, indicator_id, year, region=None):
+        """
+        League table of one indicator and year, best first, optionally
+        restricted to one region.
+        """
+        i = self._indicator_pos[indicator_id]
+        t = self._year_pos[year]
+        table = pd.DataFrame({
+            "country": self.countries,
+            "region": self.regions,
+            "value": self.cube[i, :, t],
+            "rank": self.ranks[i, :, t],
+            "percentile": self.percentiles[i, :, t],
+            "region_rank": self.region_ranks[i, :, t],
+            "region_percentile": self.region_percentiles[i, :, t],
+        })
+        if region is not None:
+            table = table[table["region"] == region]
+        return table.dropna(subset=["value"]).sort_values("rank").reset_index(drop=True)
+
+    def rank_history(self, indicator_id, country):
+        """
+        World and regional rank and percentile of `country` for every year.
+        """
+        i = self._indicator_pos[indicator_id]
+        c = self._country_pos[country]
+        return pd.DataFrame({
+            "rank": self.ranks[i, c],
+            "count": self.counts[i, c],
+            "percentile": self.percentiles[i, c],
+            "region_rank": self.region_ranks[i, c],
+            "region_percentile": self.region_percentiles[i, c],
+        }, index=pd.Index(self.years, name="date")).dropna(subset=["rank"])
+
+    def correlation(self, indicator_ids=None, year=None):
+        """
+        Correlation matrix between indicators across countries for one year,
+        or across every country-year if `year` is None.
+        """
+        if indicator_ids is None:
+            indicator_ids = self.indicator_ids
+        idx = [self._indicator_pos[ind_id] for ind_id in indicator_ids]
+        matrix = self.pooled_correlation if year is None else self.correlations[self._year_pos[year]]
+        return pd.DataFrame(matrix[np.ix_(idx, idx)], index=indicator_ids, columns=indicator_ids)
@@ -0,0 +1,255 @@
+import ast
+import collections
+import hashlib
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from economic_data import indicator_cube
+
+DERIVED_TOPIC = "Derived Indicators"
+
+derived_indicators = {
+    "DRV.TRD.OPEN.GD.ZS": {
+        "name": "Trade openness (% of GDP)",
+        "formula": "(BX.GSR.GNFS.CD + BM.GSR.GNFS.CD) / NY.GDP.MKTP.CD * 100",
+    },
+    "DRV.TRD.BAL.GD.ZS": {
+        "name": "Trade balance in goods and services (% of GDP)",
+        "formula": "(BX.GSR.GNFS.CD - BM.GSR.GNFS.CD) / NY.GDP.MKTP.CD * 100",
+    },
+    "DRV.GNS.GD.ZS": {
+        "name": "Gross savings (% of GDP)",
+        "formula": "NY.GNS.ICTR.CD / NY.GDP.MKTP.CD * 100",
+    },
+    "DRV.RES.GD.ZS": {
+        "name": "Total reserves (% of GDP)",
+        "formula": "FI.RES.TOTL.CD / NY.GDP.MKTP.CD * 100",
+    },
+    "DRV.URB.TOTL.ZS": {
+        "name": "Urban population (% of total population)",
+        "formula": "SP.URB.TOTL / SP.POP.TOTL * 100",
+    },
+    "DRV.RUR.TOTL.ZS": {
+        "name": "Rural population (% of total population)",
+        "formula": "SP.RUR.TOTL / SP.POP.TOTL * 100",
+    },
+}
+
+# Indicator ids are dotted upper-case codes, e.g. NY.GDP.MKTP.CD.
+INDICATOR_ID_PATTERN = re.compile(r"\b[A-Z][A-Z0-9]*(?:\.[A-Z0-9]+)+\b")
+
+_BINARY_OPS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+    ast.Pow: np.power,
+}
+
+_UNARY_OPS = {
+    ast.USub: np.negative,
+    ast.UAdd: np.positive,
+}
+
+_FUNCTIONS = {
+    "log": np.log,
+    "exp": np.exp,
+    "sqrt": np.sqrt,
+    "abs": np.abs,
+}
+
+
+def parse_formula(formula):
+    """
+    Parses a formula over indicator ids into (expression, dependencies).
+    Only arithmetic operators, numbers and the functions log, exp, sqrt and
+    abs are allowed; anything else raises ValueError.
+    """
+    dependencies = []
+
+    def substitute(match):
+        ind_id = match.group(0)
+        if ind_id not in dependencies:
+            dependencies.append(ind_id)
+        return f"_v{dependencies.index(ind_id)}"
+
+    try:
+        tree = ast.parse(INDICATOR_ID_PATTERN.sub(substitute, formula), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid formula {formula!r}: {e}") from e
+
+    call_targets = {id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Expression, ast.Load, ast.BinOp, ast.UnaryOp)):
+            continue
+        if isinstance(node, (ast.operator, ast.unaryop)) and type(node) in {**_BINARY_OPS, **_UNARY_OPS}:
+            continue
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            continue
+        if isinstance(node, ast.Name) and re.fullmatch(r"_v\d+", node.id):
+            continue
+        if isinstance(node, ast.Name) and id(node) in call_targets:
+            continue
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS \
+                and len(node.args) == 1 and not node.keywords:
+            continue
+        raise ValueError(f"Unsupported element in formula {formula!r}: {ast.dump(node)}")
+
+    return tree.body, dependencies
+
+
+def _evaluate(node, inputs):
+    if isinstance(node, ast.BinOp):
+        return _BINARY_OPS[type(node.op)](_evaluate(node.left, inputs), _evaluate(node.right, inputs))
+    if isinstance(node, ast.UnaryOp):
+        return _UNARY_OPS[type(node.op)](_evaluate(node.operand, inputs))
+    if isinstance(node, ast.Call):
+        return _FUNCTIONS[node.func.id](_evaluate(node.args[0], inputs))
+    if isinstance(node, ast.Constant):
+        return node.value
+    return inputs[int(node.id[2:])]
+
+
+def fingerprint(array):
+    """
+    Content hash of an array, used to detect changed inputs.
+    """
+    array = np.ascontiguousarray(array)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(array.shape).encode())
+    digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+class DerivedIndicatorEngine:
+    """
+    Evaluates declarative derived indicators over aligned (country x year) arrays.
+
+    Formulas are parsed once. Results are kept in a bounded LRU cache keyed on
+    the derived id and the fingerprints of the inputs it was computed from, so
+    several input sets (e.g. the world extract and each country selection) can
+    be cached side by side without evicting each other. Derived indicators may
+    refer to other derived indicators.
+    """
+
+    def __init__(self, definitions=None, max_entries=128):
+        self.definitions = derived_indicators if definitions is None else definitions
+        self._parsed = {}
+        for ind_id, definition in self.definitions.items():
+            self._parsed[ind_id] = parse_formula(definition["formula"])
+        self._order = self._topological_order()
+        self._cache = collections.OrderedDict()
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.computations = 0
+
+    def _topological_order(self):
+        order, visiting, done = [], set(), set()
+
+        def visit(ind_id):
+            if ind_id in done:
+                return
+            if ind_id in visiting:
+                raise ValueError(f"Circular derived indicator definition involving {ind_id}")
+            visiting.add(ind_id)
+            for dep in self._parsed[ind_id][1]:
+                if dep in self._parsed:
+                    visit(dep)
+            visiting.discard(ind_id)
+            done.add(ind_id)
+            order.append(ind_id)
+
+        for ind_id in self._parsed:
+            visit(ind_id)
+        return order
+
+    def dependencies(self, ind_id):
+        """
+        Base (non-derived) indicator ids a derived indicator depends on, transitively.
+        """
+        base = set()
+        for dep in self._parsed[ind_id][1]:
+            if dep in self._parsed:
+                base |= self.dependencies(dep)
+            else:
+                base.add(dep)
+        return base
+
+    def base_indicators(self):
+        """
+        Every base indicator id needed by the derived indicators.
+        """
+        return set().union(*(self.dependencies(ind_id) for ind_id in self._parsed))
+
+    def evaluate(self, arrays):
+        """
+        Evaluates every derived indicator whose inputs are present in `arrays`
+        ({indicator_id: array}, all of the same shape).
+        Returns {derived_id: array}.
+        """
+        available = dict(arrays)
+        fingerprints = {}
+        results = {}
+        with self._lock:
+            for ind_id in self._order:
+                expression, deps = self._parsed[ind_id]
+                if any(dep not in available for dep in deps):
+                    continue
+                for dep in deps:
+                    if dep not in fingerprints:
+                        fingerprints[dep] = fingerprint(available[dep])
+                key = (ind_id, tuple(fingerprints[dep] for dep in deps))
+
+                result = self._cache.get(key)
+                if result is not None:
+                    self._cache.move_to_end(key)
+                else:
+                    with np.errstate(divide="ignore", invalid="ignore"):
+                        result = np.asarray(_evaluate(expression, [available[dep] for dep in deps]), dtype=float)
+                    result = np.where(np.isfinite(result), result, np.nan)
+                    # Cached arrays are shared between callers.
+                    result.flags.writeable = False
+                    self._cache[key] = result
+                    self.computations += 1
+                    while len(self._cache) > self.max_entries:
+                        self._cache.popitem(last=False)
+
+                available[ind_id] = result
+                # A derived series is determined by its formula and inputs, so
+                # its key identifies it without hashing the result.
+                fingerprints[ind_id] = key
+                results[ind_id] = result
+        return results
+
+    def compute_frame(self, df_merged):
+        """
+        Computes the derived indicators from a long indicator frame (as produced
+        by `economic_data.reshape_indicators`) and returns them in the same layout,
+        under the `DERIVED_TOPIC` topic.
+        """
+        columns = ["country", "date", "indicator", "value", "indicator_id", "indicator_name", "topic"]
+        base_ids = sorted(self.base_indicators() & set(df_merged["indicator_id"].dropna()))
+        if not base_ids:
+            return pd.DataFrame(columns=columns)
+
+        cube, indicator_ids, countries, years = indicator_cube(df_merged, base_ids)
+        results = self.evaluate(dict(zip(indicator_ids, cube)))
+
+        frames = []
+        for ind_id, values in results.items():
+            name = self.definitions[ind_id]["name"]
+            frames.append(pd.DataFrame({
+                "country": np.repeat(countries, len(years)),
+                "date": pd.array(np.tile(years, len(countries)), dtype="Int64"),
+                "indicator": name,
+                "value": values.ravel(),
+                "indicator_id": ind_id,
+                "indicator_name": name,
+                "topic": DERIVED_TOPIC,
+            }))
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)[columns]
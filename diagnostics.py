@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _as_array(panel):
+    return np.asarray(panel, dtype=float)
+
+
+def growth_rates(panel, log=True):
+    """
+    Year-on-year growth of every column of a (year x country) panel.
+    Log growth is log(x_t / x_{t-1}); otherwise the percentage change as a fraction.
+    """
+    values = _as_array(panel)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if log:
+            growth = np.diff(np.log(values), axis=0)
+        else:
+            growth = values[1:] / values[:-1] - 1
+    growth = np.vstack([np.full((1, values.shape[1]), np.nan), growth])
+    growth[~np.isfinite(growth)] = np.nan
+    return pd.DataFrame(growth, index=panel.index, columns=panel.columns)
+
+
+def _moments(values, axis):
+    """
+    Mean, standard deviation (ddof=1), skewness and excess kurtosis along `axis`,
+    ignoring NaNs. Skewness and kurtosis use the biased estimators, as
+    scipy.stats.skew and scipy.stats.kurtosis do by default.
+    """
+    n = np.sum(~np.isnan(values), axis=axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.nansum(values, axis=axis) / n
+        dev = values - np.expand_dims(mean, axis)
+        m2 = np.nansum(dev ** 2, axis=axis) / n
+        m3 = np.nansum(dev ** 3, axis=axis) / n
+        m4 = np.nansum(dev ** 4, axis=axis) / n
+        std = np.sqrt(m2 * n / (n - 1))
+        skew = m3 / m2 ** 1.5
+        kurt = m4 / m2 ** 2 - 3
+    return n, mean, std, skew, kurt
+
+
+def summary_statistics(panel):
+    """
+    Per-column count, mean, standard deviation, skewness and excess kurtosis.
+    """
+    n, mean, std, skew, kurt = _moments(_as_array(panel), axis=0)
+    return pd.DataFrame(
+        {"n_obs": n, "mean": mean, "std": std, "skew": skew, "kurtosis": kurt},
+        index=panel.columns,
+    )
+
+
+def rolling_moments(panel, window=4):
+    """
+    Rolling mean, standard deviation, skewness and excess kurtosis of every
+    column. Windows containing a missing value yield NaN.
+    Returns a dict of (year x country) frames.
+    """
+    values = _as_array(panel)
+    index = panel.index[window - 1:]
+    if len(index) == 0:
+        empty = pd.DataFrame(index=index, columns=panel.columns, dtype=float)
+        return {"mean": empty, "std": empty, "skew": empty, "kurtosis": empty}
+
+    windows = sliding_window_view(values, window, axis=0)
+    n, mean, std, skew, kurt = _moments(windows, axis=2)
+    incomplete = n < window
+
+    result = {}
+    for name, stat in (("mean", mean), ("std", std), ("skew", skew), ("kurtosis", kurt)):
+        stat = np.where(incomplete, np.nan, stat)
+        result[name] = pd.DataFrame(stat, index=index, columns=panel.columns)
+    return result
+
+
+def acf(panel, nlags=20):
+    """
+    Autocorrelation function of every column up to `nlags`, computed for the
+    whole panel at once with an FFT. Missing values are treated as zero
+    deviations from the column mean.
+    Returns a (lag x country) frame.
+    """
+    values = _as_array(panel)
+    n_obs = np.sum(~np.isnan(values), axis=0)
+    dev = np.nan_to_num(values - np.nanmean(values, axis=0))
+
+    n = len(values)
+    nfft = 1 << (2 * n - 1).bit_length()
+    spectrum = np.fft.rfft(dev, n=nfft, axis=0)
+    acov = np.fft.irfft(spectrum * np.conj(spectrum), n=nfft, axis=0)[:nlags + 1] / n_obs
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = acov / acov[0]
+    return pd.DataFrame(result, index=pd.RangeIndex(nlags + 1, name="lag"), columns=panel.columns)
+
+
+def pacf(acf_frame):
+    """
+    Partial autocorrelation function from an `acf` frame, using the
+    Durbin-Levinson recursion vectorized over countries.
+    """
+    r = acf_frame.to_numpy()
+    nlags = len(r) - 1
+    n_cols = r.shape[1]
+
+    result = np.full((nlags + 1, n_cols), np.nan)
+    result[0] = 1.0
+    phi = np.zeros((nlags + 1, n_cols))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for k in range(1, nlags + 1):
+            num = r[k] - np.sum(phi[1:k] * r[k - 1:0:-1], axis=0)
+            den = 1 - np.sum(phi[1:k] * r[1:k], axis=0)
+            phi_kk = num / den
+            phi[1:k] = phi[1:k] - phi_kk * phi[k - 1:0:-1]
+            phi[k] = phi_kk
+            result[k] = phi_kk
+    return pd.DataFrame(result, index=acf_frame.index, columns=acf_frame.columns)
+
+
+def ljung_box(panel, lags=10, acf_frame=None):
+    """
+    Ljung-Box Q statistic and p-value of every column for lags 1..`lags`.
+    Returns a frame with one row per country.
+    """
+    from scipy.stats import chi2
+
+    if acf_frame is None or len(acf_frame) <= lags:
+        acf_frame = acf(panel, nlags=lags)
+    r = acf_frame.to_numpy()[1:lags + 1]
+    n = np.sum(~np.isnan(_as_array(panel)), axis=0)
+    k = np.arange(1, lags + 1)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q = n * (n + 2) * np.sum(r ** 2 / (n - k), axis=0)
+    return pd.DataFrame({"lb_stat": q, "lb_pvalue": chi2.sf(q, lags)}, index=panel.columns)
+
+
+def panel_diagnostics(panel, nlags=20, lb_lags=10, window=4):
+    """
+    Runs every diagnostic on a (year x country) panel.
+    Returns a dict with the summary statistics, rolling moments, ACF, PACF and
+    Ljung-Box results.
+    """
+    panel = panel.dropna(how="all", axis=1)
+    nlags = max(1, min(nlags, len(panel) - 1))
+    lb_lags = max(1, min(lb_lags, nlags))
+    acf_frame = acf(panel, nlags=nlags)
+    return {
+        "summary": summary_statistics(panel),
+        "rolling": rolling_moments(panel, window=window),
+        "acf": acf_frame,
+        "pacf": pacf(acf_frame),
+        "ljung_box": ljung_box(panel, lags=lb_lags, acf_frame=acf_frame),
+    }
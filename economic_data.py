@@ -0,0 +1,256 @@
+import datetime
+import os
+import threading
+from collections.abc import MutableMapping
+
+import numpy as np
+import pandas as pd
+
+grouped_indicators = {
+    "Business Environment": {
+        "IC.BUS.EASE.DFRN.XQ.DB1719": "Global: Ease of doing business score (DB17-20 methodology)",
+        "IC.BUS.EASE.XQ": "Ease of doing business rank (1=most business-friendly regulations)",
+        "IC.CNST.PRMT.RK": "Rank: Dealing with construction permits (1=most business-friendly regulations)",
+        "IC.CRED.ACC.CRD.RK": "Rank: Getting credit (1=most business-friendly regulations)",
+        "IC.ELC.ACES.RK.DB19": "Rank: Getting electricity (1=most business-friendly regulations)",
+        "IC.REG.STRT.BUS.RK.DB19": "Rank: Starting a business (1=most business-friendly regulations)",
+        "PAY.TAX.RK.DB19": "Rank: Paying taxes (1=most business-friendly regulations)",
+        "RESLV.ISV.RK.DB19": "Rank: Resolving insolvency (1=most business-friendly regulations)",
+        "TRD.ACRS.BRDR.RK.DB19": "Rank: Trading across borders (1=most business-friendly regulations)",
+    },
+    "Economic Performance": {
+        "NY.GDP.MKTP.CD": "GDP (current US$)",
+        "NY.GDP.PCAP.CD": "GDP per capita (current US$)",
+        "NY.GDP.DEFL.KD.ZG": "Inflation, GDP deflator (annual %)",
+        "NY.GDP.MKTP.KD.ZG": "GDP growth (annual %)",
+        "NY.GDP.PCAP.KD.ZG": "GDP per capita growth (annual %)",
+        "NY.GNS.ICTR.CD": "Gross savings (current US$)",
+    },
+    "Trade & Investment": {
+        "BG.GSR.NFSV.GD.ZS": "Trade in services (% of GDP)",
+        "BM.GSR.GNFS.CD": "Imports of goods and services (BoP, current US$)",
+        "BM.KLT.DINV.WD.GD.ZS": "Foreign direct investment, net outflows (% of GDP)",
+        "BN.CAB.XOKA.GD.ZS": "Current account balance (% of GDP)",
+        "BN.KLT.DINV.CD": "Foreign direct investment, net (BoP, current US$)",
+        "BN.KLT.PTXL.CD": "Portfolio Investment, net (BoP, current US$)",
+        "BX.GSR.GNFS.CD": "Exports of goods and services (BoP, current US$)",
+    },
+    "Financial Indicators": {
+        "CM.MKT.LCAP.GD.ZS": "Market capitalization of listed domestic companies (% of GDP)",
+        "GB.XPD.RSDV.GD.ZS": "Research and development expenditure (% of GDP)",
+        "GC.DOD.TOTL.GD.ZS": "Central government debt, total (% of GDP)",
+    },
+    "Social Indicators": {
+        "EN.POP.DNST": "Population density (people per sq. km of land area)",
+        "FI.RES.TOTL.CD": "Total reserves (includes gold, current US$)",
+        "FP.CPI.TOTL": "Consumer price index (2010 = 100)",
+        "FP.CPI.TOTL.ZG": "Inflation, consumer prices (annual %)",
+        "FP.WPI.TOTL": "Wholesale price index (2010 = 100)",
+        "SE.ADT.LITR.ZS": "Literacy rate, adult total (% of people ages 15 and above)",
+        "SE.ADT.1524.LT.ZS": "Literacy rate, youth total (% of people ages 15-24)",
+        "SH.DTH.IMRT": "Number of infant deaths",
+        "SH.MED.BEDS.ZS": "Hospital beds (per 1,000 people)",
+        "SI.POV.GINI": "Gini index",
+        "SL.UEM.1524.NE.ZS": "Unemployment, youth total (% of total labor force ages 15-24) (national estimate)",
+        "SL.UEM.TOTL.NE.ZS": "Unemployment, total (% of total labor force) (national estimate)",
+        "SM.POP.NETM": "Net migration",
+        "SP.DYN.LE00.IN": "Life expectancy at birth, total (years)",
+        "SP.POP.GROW": "Population growth (annual %)",
+        "SP.POP.TOTL": "Population, total",
+        "SP.RUR.TOTL": "Rural population",
+        "SP.URB.TOTL": "Urban population",
+    },
+    "Governance Indicators": {
+        "GE.EST": "Government Effectiveness: Estimate",
+        "PV.EST": "Political Stability and Absence of Violence/Terrorism: Estimate",
+    },
+}
+
+
+def all_indicators():
+    """
+    Returns every dashboard indicator as an {indicator_id: indicator_name} dict.
+    """
+    return {
+        ind_id: ind_name
+        for indicators in grouped_indicators.values()
+        for ind_id, ind_name in indicators.items()
+    }
+
+
+def indicators_frame():
+    """
+    Returns the indicator catalog as an (indicator_id, indicator_name, topic) DataFrame.
+    """
+    indicators_flat = []
+    for topic, indicators in grouped_indicators.items():
+        for ind_id, ind_name in indicators.items():
+            indicators_flat.append({
+                "indicator_id": ind_id,
+                "indicator_name": ind_name,
+                "topic": topic
+            })
+    return pd.DataFrame(indicators_flat)
+
+
+class _LockedCache(MutableMapping):
+    """
+    Serializes access to wbdata's shelve-backed response cache, which is not
+    safe to use from several threads at once.
+    """
+
+    def __init__(self, cache):
+        self._cache = cache
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._cache[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+
+    def __delitem__(self, key):
+        with self._lock:
+            del self._cache[key]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._cache
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._cache))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cache)
+
+
+_wbdata_lock = threading.Lock()
+
+
+def _thread_safe_wbdata():
+    """
+    Returns the wbdata module with its default client's cache guarded by a
+    lock, so indicators can be fetched concurrently from worker threads.
+    """
+    import wbdata
+
+    fetcher = wbdata.get_default_client().fetcher
+    with _wbdata_lock:
+        if not isinstance(fetcher.cache, _LockedCache):
+            fetcher.cache = _LockedCache(fetcher.cache)
+    return wbdata
+
+
+def fetch_indicators(indicators, countries, date_range, keep_levels=False):
+    """
+    Fetches data from wbdata and returns a DataFrame.
+    Safe to call from several threads at once.
+    """
+    wbdata = _thread_safe_wbdata()
+
+    return wbdata.get_dataframe(
+        indicators,
+        country=countries,
+        date=date_range,
+        keep_levels=keep_levels,
+    )
+
+
+def reshape_indicators(df):
+    """
+    Turns a wide wbdata frame with `country` and `date` columns into a long
+    frame with one row per (country, date, indicator), tagged with the
+    indicator id and topic. Rows without a valid year are dropped.
+
+    Returns (df_merged, unmatched) where `unmatched` lists the indicator names
+    that do not belong to any topic.
+    """
+    df_melted = df.melt(
+        id_vars=["country", "date"],
+        var_name="indicator",
+        value_name="value"
+    )
+
+    df_merged = df_melted.merge(
+        indicators_frame(),
+        how="left",
+        left_on="indicator",
+        right_on="indicator_name"
+    )
+
+    unmatched = df_merged[df_merged["topic"].isna()]["indicator"].unique()
+
+    df_merged["date"] = pd.to_numeric(df_merged["date"], errors='coerce').astype('Int64')
+    df_merged = df_merged.dropna(subset=["date"])
+    return df_merged, unmatched
+
+
+def find_latest_weo_release(year, desired_release_month=10):
+    """
+    Returns the most recent WEO release of `year` (at or before `desired_release_month`),
+    reusing a file already on disk and downloading it otherwise.
+    Returns (filename, release, failures), `failures` being (release, error) pairs.
+    """
+    import weo
+
+    failures = []
+    for release_month in range(desired_release_month, 0, -1):
+        release_str = datetime.datetime(year, release_month, 1).strftime('%b')
+        filename = f'weo_{year}_{release_str}.csv'
+        if os.path.exists(filename):
+            return filename, release_str, failures
+        try:
+            weo.download(year=year, release=release_str, filename=filename)
+            return filename, release_str, failures
+        except Exception as e:
+            failures.append((release_str, e))
+    return None, None, failures
+
+
+def weo_projection_frame(c):
+    """
+    Derives the projection series shown in the dashboard from one country's
+    WEO data. Raises AttributeError if a required WEO variable is missing.
+    """
+    df = pd.DataFrame()
+
+    df["GDP"] = (c.NGDP_RPCH.dropna() / 100 + 1).cumprod() * 100
+    df["CPI"] = c.PCPIPCH
+    df["FX"] = c.NGDP / c.NGDPD
+    df["DEFICIT"] = (c.GGR - c.GGX) / c.NGDP * 100
+    df["CA"] = c.BCA / c.NGDPD * 100
+
+    df["_GDEBT"] = (c.GGXWDG / c.NGDP) * 100
+    df["_NDEBT"] = (c.GGXWDN / c.NGDP) * 100
+
+    if isinstance(df.index, pd.PeriodIndex):
+        df.index = df.index.to_timestamp()
+
+    elif not pd.api.types.is_datetime64_any_dtype(df.index):
+        df.index = df.index.astype(str)
+
+    return df
+
+
+def indicator_cube(df_merged, indicator_ids=None):
+    """
+    Aligns a long (country, date, indicator_id, value) frame into a dense
+    (indicator x country x year) array, with NaN where no value exists.
+    Returns (cube, indicator_ids, countries, years).
+    """
+    if indicator_ids is None:
+        indicator_ids = sorted(df_merged["indicator_id"].dropna().unique())
+    countries = sorted(df_merged["country"].unique())
+    years = sorted(int(year) for year in df_merged["date"].dropna().unique())
+
+    cube = np.full((len(indicator_ids), len(countries), len(years)), np.nan)
+    df = df_merged[df_merged["indicator_id"].isin(indicator_ids)]
+    ind_pos = pd.Index(indicator_ids).get_indexer(df["indicator_id"])
+    country_pos = pd.Index(countries).get_indexer(df["country"])
+    year_pos = pd.Index(years).get_indexer(df["date"].astype(int))
+    cube[ind_pos, country_pos, year_pos] = pd.to_numeric(df["value"], errors="coerce").to_numpy(dtype=float)
+    return cube, list(indicator_ids), countries, years
@@ -0,0 +1,273 @@
+import argparse
+import datetime
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from country_catalog import load_country_catalog
+from economic_data import (
+    all_indicators,
+    fetch_indicators,
+    reshape_indicators,
+    find_latest_weo_release,
+    weo_projection_frame,
+)
+
+EXPORTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exports")
+
+INDICATOR_COLUMNS = ["country", "country_id", "date", "indicator_id", "indicator_name", "topic", "value"]
+
+WEO_COLUMNS = ["country", "iso", "year", "variable", "value"]
+
+
+class ChunkWriter:
+    """
+    Appends DataFrame chunks to a single Parquet or CSV file, so an export
+    never holds more than one chunk in memory.
+
+    Chunks go to a temporary file that only replaces `path` on `close()`, so
+    readers keep seeing the previous complete file while an export runs, and a
+    failed export (`abort()`) leaves it untouched.
+    """
+
+    def __init__(self, path, fmt):
+        if fmt not in ("parquet", "csv"):
+            raise ValueError(f"Unsupported format: {fmt}")
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.fmt = fmt
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def write(self, df):
+        if df.empty:
+            return
+        if self.fmt == "csv":
+            df.to_csv(self.tmp_path, mode="a", header=self.rows == 0, index=False)
+        else:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                sys.exit("Parquet export requires pyarrow (pip install pyarrow), or use --format csv.")
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                self._writer = pq.ParquetWriter(self.tmp_path, self._schema)
+            self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        """
+        Finishes the export and moves it onto `path`. An export with no rows
+        leaves the previous file in place.
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if os.path.exists(self.tmp_path):
+            os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """
+        Discards the export, keeping the previous file at `path`.
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def find_indicator_extract(output_dir=EXPORTS_DIR):
+    """
+    Returns the path of the most recent indicator extract written by this CLI
+    in `output_dir`, or None if there is none.
+    """
+    paths = [os.path.join(output_dir, f"indicators.{fmt}") for fmt in ("parquet", "csv")]
+    paths = [path for path in paths if os.path.exists(path)]
+    return max(paths, key=os.path.getmtime) if paths else None
+
+
+def read_indicator_extract(path):
+    """
+    Reads an indicator extract back as a long (country, date, indicator_id, value) frame.
+    """
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, dtype={column: "string" for column in INDICATOR_COLUMNS if column not in ("date", "value")})
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def export_indicators(writer, country_ids, indicators, date_range, chunk_size=20, retries=1):
+    """
+    Fetches and reshapes the World Bank indicators `chunk_size` countries at a
+    time, writing each chunk as soon as it is ready. A failed fetch is retried
+    `retries` times before the chunk is skipped.
+    Returns the country ids of the skipped chunks.
+    """
+    names_to_ids = {c["name"]: c["id"] for c in load_country_catalog()}
+    skipped = []
+
+    for chunk in chunked(country_ids, chunk_size):
+        for _ in range(retries + 1):
+            try:
+                df = fetch_indicators(indicators, chunk, date_range, keep_levels=True)
+                break
+            except Exception as e:
+                error = e
+        else:
+            print(f"  skipped {', '.join(chunk)}: {error}", file=sys.stderr)
+            skipped.extend(chunk)
+            continue
+        if df.empty:
+            continue
+
+        df_merged, _ = reshape_indicators(df.reset_index())
+        df_merged = df_merged.dropna(subset=["value"])
+
+        # Indicators outside the dashboard catalog are labelled by their id.
+        df_merged["indicator_id"] = df_merged["indicator_id"].fillna(df_merged["indicator"])
+        df_merged["indicator_name"] = df_merged["indicator_name"].fillna(df_merged["indicator"])
+        df_merged["country_id"] = df_merged["country"].map(names_to_ids)
+        for column in ["country", "country_id", "indicator_id", "indicator_name", "topic"]:
+            df_merged[column] = df_merged[column].astype("string")
+        df_merged["date"] = df_merged["date"].astype("int64")
+        df_merged["value"] = df_merged["value"].astype("float64")
+
+        writer.write(df_merged[INDICATOR_COLUMNS])
+        print(f"  {', '.join(chunk)}: {len(df_merged)} rows")
+
+    return skipped
+
+
+def export_weo(writer, year, chunk_size=20):
+    """
+    Writes the dashboard's derived WEO projection series for every country in
+    the latest release of `year`.
+    Returns the ISO codes of the skipped countries, or None if no release was found.
+    """
+    import weo
+
+    filename, release, failures = find_latest_weo_release(year)
+    for failed_release, error in failures:
+        print(f"  WEO {failed_release} {year} unavailable: {error}", file=sys.stderr)
+    if filename is None:
+        print(f"  no WEO release found for {year}", file=sys.stderr)
+        return None
+
+    weo_data = weo.WEO(filename)
+    countries = weo_data.countries()[["Country", "ISO"]].dropna().drop_duplicates("ISO")
+    skipped = []
+
+    for chunk in chunked(list(countries.itertuples(index=False)), chunk_size):
+        frames = []
+        for country, iso in chunk:
+            try:
+                df = weo_projection_frame(weo_data.country(iso))
+            except Exception as e:
+                print(f"  skipped WEO {iso}: {e}", file=sys.stderr)
+                skipped.append(iso)
+                continue
+            if pd.api.types.is_datetime64_any_dtype(df.index):
+                years = df.index.year
+            else:
+                years = pd.to_numeric(pd.Index(df.index).astype(str).str[:4], errors="coerce")
+            df = df.assign(year=np.asarray(years)).melt(id_vars="year", var_name="variable", value_name="value")
+            frames.append(df.dropna().assign(country=country, iso=iso))
+        if frames:
+            df_chunk = pd.concat(frames, ignore_index=True)
+            df_chunk["year"] = df_chunk["year"].astype("int64")
+            for column in ["country", "iso", "variable"]:
+                df_chunk[column] = df_chunk[column].astype("string")
+            df_chunk["value"] = df_chunk["value"].astype("float64")
+            writer.write(df_chunk[WEO_COLUMNS])
+    print(f"  WEO {release} {year}: {writer.rows} rows")
+    return skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export the World Bank indicator panel and the WEO projections without the web app."
+    )
+    parser.add_argument("--countries", nargs="+", default=["all"],
+                        help="ISO3 country codes, or 'all' for every economy in the country catalog")
+    parser.add_argument("--include-aggregates", action="store_true",
+                        help="With --countries all, also export regional and income aggregates")
+    parser.add_argument("--indicators", nargs="+", default=None,
+                        help="World Bank indicator ids (default: every dashboard indicator)")
+    parser.add_argument("--start", type=int, default=1960)
+    parser.add_argument("--end", type=int, default=datetime.datetime.now().year)
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--output-dir", default=EXPORTS_DIR)
+    parser.add_argument("--chunk-size", type=int, default=20, help="Countries per request and per written chunk")
+    parser.add_argument("--weo", action="store_true", help="Also export the WEO projections")
+    parser.add_argument("--weo-year", type=int, default=datetime.datetime.now().year)
+    parser.add_argument("--skip-indicators", action="store_true", help="Only export the WEO projections")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    incomplete = []
+
+    if not args.skip_indicators:
+        if args.countries == ["all"]:
+            country_ids = [
+                c["id"] for c in load_country_catalog()
+                if args.include_aggregates or c["region"]["value"] != "Aggregates"
+            ]
+        else:
+            country_ids = args.countries
+
+        indicators = all_indicators()
+        if args.indicators:
+            indicators = {ind_id: indicators.get(ind_id, ind_id) for ind_id in args.indicators}
+
+        path = os.path.join(args.output_dir, f"indicators.{args.format}")
+        print(f"Exporting {len(indicators)} indicators for {len(country_ids)} countries to {path}")
+        writer = ChunkWriter(path, args.format)
+        try:
+            skipped = export_indicators(writer, country_ids, indicators, (str(args.start), str(args.end)), args.chunk_size)
+        except BaseException:
+            writer.abort()
+            raise
+        if skipped:
+            writer.abort()
+            incomplete.append(f"{path} not updated: {len(skipped)} countries failed: {', '.join(skipped)}")
+        else:
+            writer.close()
+            print(f"Wrote {writer.rows} rows to {path}")
+
+    if args.weo:
+        path = os.path.join(args.output_dir, f"weo_projections.{args.format}")
+        print(f"Exporting WEO projections to {path}")
+        writer = ChunkWriter(path, args.format)
+        try:
+            skipped = export_weo(writer, args.weo_year, args.chunk_size)
+        except BaseException:
+            writer.abort()
+            raise
+        if skipped is None:
+            writer.abort()
+            incomplete.append(f"{path} not updated: no WEO release found for {args.weo_year}")
+        elif skipped:
+            writer.abort()
+            incomplete.append(f"{path} not updated: {len(skipped)} countries failed: {', '.join(skipped)}")
+        else:
+            writer.close()
+            print(f"Wrote {writer.rows} rows to {path}")
+
+    if incomplete:
+        sys.exit("Export incomplete:\n" + "\n".join(incomplete))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import copy
+import os
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+
+class LSTM(nn.Module):
+    def __init__(self, input_dim=1, hidden_dim=15, output_dim=1, layer_num=1):
+        super().__init__()
+        self.lstm = nn.LSTM(input_dim, hidden_dim, layer_num, batch_first=True)
+        self.linear = nn.Linear(hidden_dim, output_dim)
+
+    def forward(self, input_seq):
+        lstm_out, _ = self.lstm(input_seq)
+
+        last_out = lstm_out[:, -1, :]
+
+        output = self.linear(last_out)
+
+        return output
+
+
+def create_sequences(input_data, tw):
+    """
+    Transform a time series into a prediction dataset
+    X : our feature
+    y : prediction
+    tw : training window
+    """
+    input_data = np.asarray(input_data, dtype=np.float32)
+    L = len(input_data)
+    idx = np.arange(tw)[None, :] + np.arange(L - tw)[:, None]
+    X = input_data[idx]
+    y = input_data[tw:]
+    return torch.tensor(X, dtype=torch.float32), torch.tensor(y, dtype=torch.float32)
+
+
+def train_val_split(X, y, val_fraction=0.2):
+    """
+    Splits sequences chronologically, keeping the last `val_fraction` of the
+    samples for validation so that no future data leaks into training.
+    """
+    n_val = max(1, int(round(len(X) * val_fraction)))
+    return X[:-n_val], y[:-n_val], X[-n_val:], y[-n_val:]
+
+
+def save_checkpoint(path, state):
+    """
+    Writes a training checkpoint atomically, so an interrupted save never
+    leaves a truncated file behind.
+    """
+    tmp_path = f"{path}.tmp"
+    torch.save(state, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def training_loop(n_epochs, lstm, optimiser, loss_fn, X_train, y_train, X_val, y_val,
+                  batch_size=None, patience=5, eval_every=10, min_delta=0.0,
+                  checkpoint_path=None, resume=False, verbose=True):
+    """
+    Trains `lstm` with patience-based early stopping on (X_val, y_val).
+
+    The validation RMSE is computed every `eval_every` epochs; training stops once
+    it has not improved by more than `min_delta` for `patience` evaluations, and
+    the best weights seen are restored before returning. The training RMSE is the
+    running mean of the batch losses, so no extra pass over X_train is made.
+
+    If `checkpoint_path` is given, the full training state is saved there at each
+    evaluation, and `resume=True` continues from an existing checkpoint.
+
+    Returns a history dict with the evaluated epochs and RMSE curves.
+    """
+    if len(X_train) == 0 or len(X_val) == 0:
+        raise ValueError("training_loop needs at least one training and one validation sample")
+
+    if batch_size is None:
+        batches = [(X_train, y_train)]
+        loader = None
+    else:
+        loader = torch.utils.data.DataLoader(
+            torch.utils.data.TensorDataset(X_train, y_train),
+            shuffle=True,
+            batch_size=batch_size,
+        )
+
+    history = {"epoch": [], "train_rmse": [], "val_rmse": []}
+    best_loss = np.inf
+    best_state = copy.deepcopy(lstm.state_dict())
+    best_epoch = 0
+    bad_evals = 0
+    start_epoch = 0
+
+    if resume and checkpoint_path and os.path.exists(checkpoint_path):
+        checkpoint = torch.load(checkpoint_path, weights_only=False)
+        lstm.load_state_dict(checkpoint["model"])
+        optimiser.load_state_dict(checkpoint["optimiser"])
+        history = checkpoint["history"]
+        best_loss = checkpoint["best_loss"]
+        best_state = checkpoint["best_state"]
+        best_epoch = checkpoint["best_epoch"]
+        bad_evals = checkpoint["bad_evals"]
+        start_epoch = checkpoint["epoch"] + 1
+        if bad_evals >= patience:
+            start_epoch = n_epochs
+        if verbose:
+            print(f"Resuming from epoch {start_epoch} (best validation RMSE: {np.sqrt(best_loss):.5f})")
+
+    for epoch in range(start_epoch, n_epochs):
+        lstm.train()
+        running_loss = 0.0
+        n_seen = 0
+        for x_batch, y_batch in (loader if loader is not None else batches):
+            optimiser.zero_grad()
+            outputs = lstm(x_batch)
+            loss = loss_fn(outputs, y_batch)
+            loss.backward()
+            optimiser.step()
+            running_loss += loss.item() * len(x_batch)
+            n_seen += len(x_batch)
+
+        if epoch % eval_every != 0 and epoch != n_epochs - 1:
+            continue
+
+        lstm.eval()
+        with torch.no_grad():
+            val_loss = loss_fn(lstm(X_val), y_val).item()
+
+        train_rmse = np.sqrt(running_loss / n_seen)
+        val_rmse = np.sqrt(val_loss)
+        history["epoch"].append(epoch)
+        history["train_rmse"].append(train_rmse)
+        history["val_rmse"].append(val_rmse)
+
+        if verbose:
+            print(f"Epoch: {epoch}, Train RMSE: {train_rmse:.5f}, Validation RMSE: {val_rmse:.5f}")
+
+        if val_loss < best_loss - min_delta:
+            best_loss = val_loss
+            best_state = copy.deepcopy(lstm.state_dict())
+            best_epoch = epoch
+            bad_evals = 0
+        else:
+            bad_evals += 1
+
+        if checkpoint_path:
+            save_checkpoint(checkpoint_path, {
+                "epoch": epoch,
+                "model": lstm.state_dict(),
+                "optimiser": optimiser.state_dict(),
+                "history": history,
+                "best_loss": best_loss,
+                "best_state": best_state,
+                "best_epoch": best_epoch,
+                "bad_evals": bad_evals,
+            })
+
+        if bad_evals >= patience:
+            if verbose:
+                print(f"Stopping early: no improvement for {patience} evaluations.")
+            break
+
+    lstm.load_state_dict(best_state)
+    history["best_epoch"] = best_epoch
+    history["best_val_rmse"] = float(np.sqrt(best_loss))
+    if verbose:
+        print(f"Restored best weights from epoch {best_epoch} (validation RMSE: {history['best_val_rmse']:.5f})")
+    return history
+
+
+def fit_lstm(values, lookback=3, hidden_dim=15, n_epochs=2000, lr=0.001, batch_size=8,
+             patience=10, eval_every=10, verbose=False, model=None):
+    """
+    Fits an LSTM on a univariate series scaled to [0, 1].
+    Passing a previously trained `model` warm-starts from its weights.
+    Returns the trained model and the fitted MinMaxScaler.
+    """
+    from sklearn.preprocessing import MinMaxScaler
+
+    raw = np.asarray(values, dtype=np.float32).reshape(-1, 1)
+    scaler = MinMaxScaler()
+    normalized = scaler.fit_transform(raw)
+
+    X, y = create_sequences(normalized, lookback)
+    X_fit, y_fit, X_val, y_val = train_val_split(X, y, val_fraction=0.2)
+
+    if model is None:
+        model = LSTM(hidden_dim=hidden_dim)
+    optimiser = torch.optim.Adam(model.parameters(), lr=lr)
+    training_loop(
+        n_epochs, model, optimiser, torch.nn.MSELoss(), X_fit, y_fit, X_val, y_val,
+        batch_size=batch_size, patience=patience, eval_every=eval_every, verbose=verbose,
+    )
+    model.eval()
+    return model, scaler
+
+
+def forecast_lstm(model, scaler, values, steps, lookback=3):
+    """
+    Recursive multi-step forecast: each prediction is fed back as the newest
+    input of the window. Returns the forecasts on the original scale.
+    """
+    window = scaler.transform(np.asarray(values, dtype=np.float32)[-lookback:].reshape(-1, 1))
+    window = torch.tensor(window, dtype=torch.float32).unsqueeze(0)
+    preds = []
+    with torch.no_grad():
+        for _ in range(steps):
+            pred = model(window)
+            preds.append(pred.item())
+            window = torch.cat([window[:, 1:, :], pred.unsqueeze(1)], dim=1)
+    return scaler.inverse_transform(np.array(preds).reshape(-1, 1)).ravel()
+
+
+def fit_arima(values, order=(1, 0, 1)):
+    """
+    Fits an ARIMA model on a univariate series.
+    """
+    from statsmodels.tsa.arima.model import ARIMA
+
+    return ARIMA(np.asarray(values, dtype=float), order=order).fit()
+
+
+def forecast_arima(results, steps):
+    """
+    Forecasts `steps` periods ahead from a fitted ARIMA model.
+    """
+    return np.asarray(results.forecast(steps=steps))
@@ -0,0 +1,159 @@
+import os
+
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn as nn
+
+from model_registry import ModelRegistry
+
+
+def set_inference_threads(num_threads=None):
+    """
+    Tunes torch's CPU threading for small, latency-bound models: intra-op
+    parallelism is capped (the matrices are tiny, extra threads only add
+    synchronisation cost) and inter-op parallelism is disabled.
+    """
+    if num_threads is None:
+        num_threads = min(4, os.cpu_count() or 1)
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set once, before any inter-op parallel work started.
+        pass
+
+
+class BatchedLSTMForecaster(nn.Module):
+    """
+    Runs the recursive forecasts of many single-layer `forecasting.LSTM` models
+    (one per country) in a single batched computation.
+
+    The weights of every model are stacked along a leading model axis and the
+    LSTM cell is evaluated with batched matrix products, so one call serves all
+    countries at once. Inputs and outputs are on the scaled [0, 1] range.
+    """
+
+    def __init__(self, models):
+        super().__init__()
+        for model in models:
+            if model.lstm.num_layers != 1 or model.lstm.input_size != 1:
+                raise ValueError("BatchedLSTMForecaster only supports single-layer univariate LSTMs.")
+        hidden_sizes = {model.lstm.hidden_size for model in models}
+        if len(hidden_sizes) != 1:
+            raise ValueError(f"All models must share the same hidden size, got {sorted(hidden_sizes)}.")
+
+        self.hidden_size = hidden_sizes.pop()
+        self.register_buffer("w_ih", torch.stack([m.lstm.weight_ih_l0.detach() for m in models]).transpose(1, 2))
+        self.register_buffer("w_hh", torch.stack([m.lstm.weight_hh_l0.detach() for m in models]).transpose(1, 2))
+        self.register_buffer("b", torch.stack([(m.lstm.bias_ih_l0 + m.lstm.bias_hh_l0).detach() for m in models]).unsqueeze(1))
+        self.register_buffer("w_out", torch.stack([m.linear.weight.detach() for m in models]).transpose(1, 2))
+        self.register_buffer("b_out", torch.stack([m.linear.bias.detach() for m in models]).unsqueeze(1))
+
+    def forward(self, idx: torch.Tensor, windows: torch.Tensor, steps: int) -> torch.Tensor:
+        """
+        idx: (B,) model indices, windows: (B, lookback) scaled inputs.
+        Returns (B, steps) scaled forecasts.
+        """
+        w_ih = self.w_ih.index_select(0, idx)
+        w_hh = self.w_hh.index_select(0, idx)
+        b = self.b.index_select(0, idx)
+        w_out = self.w_out.index_select(0, idx)
+        b_out = self.b_out.index_select(0, idx)
+
+        batch = windows.size(0)
+        lookback = windows.size(1)
+        # The input projection of each window value is reused across steps.
+        x_proj = torch.bmm(windows.unsqueeze(2), w_ih) + b
+        preds = []
+        for _ in range(steps):
+            h = torch.zeros(batch, 1, self.hidden_size, dtype=windows.dtype)
+            c = torch.zeros(batch, 1, self.hidden_size, dtype=windows.dtype)
+            for t in range(lookback):
+                gates = x_proj[:, t:t + 1, :] + torch.bmm(h, w_hh)
+                i, f, g, o = gates.chunk(4, dim=2)
+                c = torch.sigmoid(f) * c + torch.sigmoid(i) * torch.tanh(g)
+                h = torch.sigmoid(o) * torch.tanh(c)
+            pred = torch.bmm(h, w_out) + b_out
+            preds.append(pred.view(batch))
+            x_proj = torch.cat([x_proj[:, 1:, :], torch.bmm(pred, w_ih) + b], dim=1)
+        return torch.stack(preds, dim=1)
+
+
+class ForecastServer:
+    """
+    CPU serving path for the LSTM forecasters of one indicator.
+
+    All the country models stored in the registry are loaded once, compiled
+    with TorchScript into a single batched forecaster, and served under
+    `torch.inference_mode`, so a request for any set of countries is one call
+    with no Python-level loop over countries or forecast steps.
+    """
+
+    def __init__(self, indicator, registry=None, num_threads=None, script=True):
+        set_inference_threads(num_threads)
+        registry = registry or ModelRegistry()
+
+        models, scale, offset, windows, last_years = [], [], [], [], []
+        self.countries = []
+        if os.path.isdir(registry.root):
+            for country in sorted(os.listdir(registry.root)):
+                meta = registry.load_meta(country, indicator, "lstm")
+                if meta is None or "last_window" not in meta:
+                    continue
+                model, scaler, lookback = registry.load_model(country, indicator, "lstm")
+                self.countries.append(country)
+                models.append(model)
+                # scale_ and min_ already guard against a zero data range.
+                scale.append(float(scaler.scale_[0]))
+                offset.append(float(scaler.min_[0]))
+                windows.append(meta["last_window"])
+                last_years.append(meta["last_year"])
+
+        if not models:
+            raise ValueError(f"No LSTM model with a stored input window found for {indicator}.")
+        if len({len(w) for w in windows}) != 1:
+            raise ValueError("All models must share the same lookback to be served together.")
+
+        self.indicator = indicator
+        self.country_index = {country: i for i, country in enumerate(self.countries)}
+        self.last_years = np.array(last_years)
+        self.scale = torch.tensor(scale, dtype=torch.float32)
+        self.offset = torch.tensor(offset, dtype=torch.float32)
+        raw_windows = torch.tensor(windows, dtype=torch.float32)
+        self.windows = raw_windows * self.scale[:, None] + self.offset[:, None]
+
+        forecaster = BatchedLSTMForecaster(models).eval()
+        self.forecaster = torch.jit.script(forecaster) if script else forecaster
+
+    def save(self, path):
+        """
+        Saves the compiled forecaster so it can be served without Python model code.
+        """
+        torch.jit.save(self.forecaster, path)
+
+    def forecast_array(self, countries=None, steps=5):
+        """
+        Returns the (countries, steps) array of forecasts on the original scale.
+        """
+        if countries is None:
+            countries = self.countries
+        idx = torch.tensor([self.country_index[c] for c in countries], dtype=torch.long)
+        with torch.inference_mode():
+            scaled = self.forecaster(idx, self.windows.index_select(0, idx), steps)
+            values = (scaled - self.offset[idx, None]) / self.scale[idx, None]
+        return values.numpy()
+
+    def forecast(self, countries=None, steps=5):
+        """
+        Returns a long frame (country, year, forecast) for the requested countries.
+        """
+        if countries is None:
+            countries = self.countries
+        values = self.forecast_array(countries, steps)
+        last_years = self.last_years[[self.country_index[c] for c in countries]]
+        return pd.DataFrame({
+            "country": np.repeat(countries, steps),
+            "year": (last_years[:, None] + np.arange(1, steps + 1)).ravel(),
+            "forecast": values.ravel(),
+        })
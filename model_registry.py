@@ -0,0 +1,273 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+MODEL_NAMES = ("arima", "lstm")
+
+# Series shorter than this are too short to fit any of the models meaningfully.
+MIN_OBSERVATIONS = 10
+
+DEFAULT_INDICATORS = {
+    "NY.GDP.MKTP.KD.ZG": "GDP growth (annual %)",
+    "FP.CPI.TOTL.ZG": "Inflation, consumer prices (annual %)",
+}
+
+
+def data_hash(data):
+    """
+    Returns a stable hash of a series' or frame's labels and values, used as the
+    data vintage.
+    """
+    if not isinstance(data, pd.DataFrame):
+        data = pd.Series(data).to_frame()
+    digest = hashlib.sha256()
+    digest.update(np.asarray(data.index.astype(str)).astype("U").tobytes())
+    if data.shape[1] > 1:
+        digest.update(np.asarray(data.columns.astype(str)).astype("U").tobytes())
+    digest.update(np.ascontiguousarray(data.to_numpy(dtype="float64")).tobytes())
+    return digest.hexdigest()
+
+
+def scaler_to_dict(scaler):
+    """
+    Serializes the fitted state of a MinMaxScaler to plain JSON types.
+    """
+    return {
+        "feature_range": list(scaler.feature_range),
+        "data_min": scaler.data_min_.tolist(),
+        "data_max": scaler.data_max_.tolist(),
+    }
+
+
+def scaler_from_dict(state):
+    """
+    Rebuilds a fitted MinMaxScaler from `scaler_to_dict` output.
+    """
+    from sklearn.preprocessing import MinMaxScaler
+
+    scaler = MinMaxScaler(feature_range=tuple(state["feature_range"]))
+    scaler.fit(np.array([state["data_min"], state["data_max"]], dtype=float))
+    return scaler
+
+
+def training_config(model_name, horizon, lookback, order):
+    """
+    The settings a stored model and its forecast depend on, as stored in
+    `meta.json`; a model trained with other settings is stale.
+    """
+    if model_name == "lstm":
+        return {"horizon": horizon, "lookback": lookback}
+    if model_name == "arima":
+        return {"horizon": horizon, "order": list(order)}
+    raise ValueError(f"Unknown model: {model_name}")
+
+
+class ModelRegistry:
+    """
+    Local store of trained forecasting models and their precomputed forecasts,
+    laid out as `<root>/<country>/<indicator>/<model>/`.
+
+    Each entry holds the model artifact, a `meta.json` describing how it was
+    trained (including the hash of the data it was trained on) and a
+    `forecast.csv` that the dashboard reads directly.
+    """
+
+    def __init__(self, root=MODELS_DIR):
+        self.root = root
+
+    def _entry_dir(self, country, indicator, model_name):
+        return os.path.join(self.root, country, indicator, model_name)
+
+    def load_meta(self, country, indicator, model_name):
+        path = os.path.join(self._entry_dir(country, indicator, model_name), "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def is_stale(self, country, indicator, model_name, vintage, config=None):
+        """
+        True if no model is stored for this key, or it was trained on other data
+        or with another training configuration (see `training_config`).
+        """
+        meta = self.load_meta(country, indicator, model_name)
+        if meta is None or meta.get("data_hash") != vintage:
+            return True
+        return config is not None and meta.get("config") != config
+
+    def save(self, country, indicator, model_name, model, meta, forecast):
+        """
+        Stores a trained model, its metadata and its forecast frame.
+        """
+        entry_dir = self._entry_dir(country, indicator, model_name)
+        os.makedirs(entry_dir, exist_ok=True)
+
+        if model_name == "lstm":
+            import torch
+
+            torch.save(model.state_dict(), os.path.join(entry_dir, "model.pt"))
+        else:
+            model.save(os.path.join(entry_dir, "model.pkl"))
+
+        forecast.to_csv(os.path.join(entry_dir, "forecast.csv"), index=False)
+
+        meta = dict(meta, saved_at=datetime.datetime.now().isoformat(timespec="seconds"))
+        tmp_path = os.path.join(entry_dir, "meta.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, os.path.join(entry_dir, "meta.json"))
+
+    def load_model(self, country, indicator, model_name):
+        """
+        Loads a stored model. LSTMs are returned as (model, scaler, lookback).
+        """
+        meta = self.load_meta(country, indicator, model_name)
+        if meta is None:
+            return None
+        entry_dir = self._entry_dir(country, indicator, model_name)
+
+        if model_name == "lstm":
+            import torch
+
+            from forecasting import LSTM
+
+            model = LSTM(hidden_dim=meta["hidden_dim"])
+            model.load_state_dict(torch.load(os.path.join(entry_dir, "model.pt")))
+            model.eval()
+            return model, scaler_from_dict(meta["scaler"]), meta["lookback"]
+
+        from statsmodels.tsa.arima.model import ARIMAResults
+
+        return ARIMAResults.load(os.path.join(entry_dir, "model.pkl"))
+
+    def load_forecast(self, country, indicator, model_name):
+        """
+        Returns the cached forecast frame (year, forecast) or None.
+        """
+        path = os.path.join(self._entry_dir(country, indicator, model_name), "forecast.csv")
+        if not os.path.exists(path):
+            return None
+        return pd.read_csv(path)
+
+    def load_forecasts(self, country, indicator):
+        """
+        Returns the cached forecasts of every model for a country and indicator,
+        stacked in a single frame with a `model` column.
+        """
+        frames = []
+        for model_name in MODEL_NAMES:
+            forecast = self.load_forecast(country, indicator, model_name)
+            if forecast is not None:
+                frames.append(forecast.assign(model=model_name))
+        if not frames:
+            return pd.DataFrame(columns=["year", "forecast", "model"])
+        return pd.concat(frames, ignore_index=True)
+
+    def refresh(self, country, indicator, series, model_names=MODEL_NAMES, horizon=5,
+                lookback=3, order=(1, 0, 1), force=False):
+        """
+        Retrains and re-forecasts the given models for one series, skipping any
+        model whose stored data hash and training configuration both match.
+        Returns the list of models that were retrained.
+        Raises ValueError if the series has fewer than `MIN_OBSERVATIONS` values.
+        """
+        series = pd.Series(series).dropna().sort_index()
+        if len(series) < MIN_OBSERVATIONS:
+            raise ValueError(f"{len(series)} observations, at least {MIN_OBSERVATIONS} needed")
+
+        import forecasting
+
+        vintage = data_hash(series)
+        years = pd.to_numeric(series.index).astype(int)
+        forecast_years = np.arange(years.max() + 1, years.max() + 1 + horizon)
+
+        retrained = []
+        for model_name in model_names:
+            config = training_config(model_name, horizon, lookback, order)
+            if not force and not self.is_stale(country, indicator, model_name, vintage, config):
+                continue
+
+            meta = {
+                "country": country,
+                "indicator": indicator,
+                "model": model_name,
+                "data_hash": vintage,
+                "first_year": int(years.min()),
+                "last_year": int(years.max()),
+                "n_obs": int(len(series)),
+                "horizon": horizon,
+                "config": config,
+            }
+
+            if model_name == "lstm":
+                if len(series) <= lookback * 2:
+                    continue
+                model, scaler = forecasting.fit_lstm(series.values, lookback=lookback)
+                values = forecasting.forecast_lstm(model, scaler, series.values, horizon, lookback=lookback)
+                meta.update(
+                    lookback=lookback,
+                    hidden_dim=model.lstm.hidden_size,
+                    scaler=scaler_to_dict(scaler),
+                    last_window=series.values[-lookback:].astype(float).tolist(),
+                )
+            elif model_name == "arima":
+                model = forecasting.fit_arima(series.values, order=order)
+                values = forecasting.forecast_arima(model, horizon)
+                meta.update(order=list(order))
+            else:
+                raise ValueError(f"Unknown model: {model_name}")
+
+            forecast = pd.DataFrame({"year": forecast_years, "forecast": values})
+            self.save(country, indicator, model_name, model, meta, forecast)
+            retrained.append(model_name)
+        return retrained
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Train the forecasting models and precompute the forecasts read by the dashboard."
+    )
+    parser.add_argument("--countries", nargs="+", required=True, help="ISO3 country codes, e.g. FRA USA")
+    parser.add_argument("--indicators", nargs="+", default=list(DEFAULT_INDICATORS), help="World Bank indicator ids")
+    parser.add_argument("--models", nargs="+", default=list(MODEL_NAMES), choices=MODEL_NAMES)
+    parser.add_argument("--horizon", type=int, default=5)
+    parser.add_argument("--root", default=MODELS_DIR)
+    parser.add_argument("--force", action="store_true", help="Retrain even if the data did not change")
+    args = parser.parse_args()
+
+    import wbdata
+
+    registry = ModelRegistry(args.root)
+    df = wbdata.get_dataframe(
+        {ind: ind for ind in args.indicators},
+        country=args.countries,
+        keep_levels=True,
+    ).reset_index()
+
+    countries = {c["name"]: c["id"] for c in wbdata.get_countries(country_id=args.countries)}
+
+    for country_name, df_country in df.groupby("country"):
+        country = countries.get(country_name, country_name)
+        df_country = df_country.set_index("date").sort_index()
+        for indicator in args.indicators:
+            try:
+                retrained = registry.refresh(
+                    country, indicator, df_country[indicator],
+                    model_names=args.models, horizon=args.horizon, force=args.force,
+                )
+            except ValueError as e:
+                print(f"{country} {indicator}: skipped ({e})")
+                continue
+            status = ", ".join(retrained) if retrained else "up to date"
+            print(f"{country} {indicator}: {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Economics_DashBoard.py")
+
+# Modules that should not be imported by the first render of the default page.
+HEAVY_MODULES = ["plotly.express", "plotly.subplots", "wbdata", "weo", "torch", "statsmodels", "sklearn", "scipy"]
+
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+t2 = time.perf_counter()
+at.run()
+t3 = time.perf_counter()
+print(json.dumps({
+    "streamlit_import": t1 - t0,
+    "first_paint": t2 - t1,
+    "rerun": t3 - t2,
+    "heavy_modules": [m for m in sys.argv[2:] if m in sys.modules],
+    "exceptions": [str(e.value) for e in at.exception],
+}))
+"""
+
+
+def run_once(dashboard=DASHBOARD):
+    """
+    Starts a fresh interpreter, renders the dashboard once headlessly and
+    returns the timings it reports, plus the total cold start wall time.
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE, dashboard, *HEAVY_MODULES],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - start
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["cold_start"] = wall
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the dashboard's cold start and first paint time.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-first-paint", type=float, default=None,
+                        help="Exit with an error if the median first paint exceeds this many seconds")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+
+    for metric in ["cold_start", "streamlit_import", "first_paint", "rerun"]:
+        values = [run[metric] for run in runs]
+        print(f"{metric:>16}: median {statistics.median(values):.3f}s  min {min(values):.3f}s  max {max(values):.3f}s")
+
+    heavy = sorted({m for run in runs for m in run["heavy_modules"]})
+    print(f"{'heavy modules':>16}: {', '.join(heavy) if heavy else 'none'}")
+
+    exceptions = [e for run in runs for e in run["exceptions"]]
+    if exceptions:
+        print(f"{'exceptions':>16}: {exceptions[0]}")
+        sys.exit(1)
+
+    if args.max_first_paint is not None:
+        median_first_paint = statistics.median(run["first_paint"] for run in runs)
+        if median_first_paint > args.max_first_paint:
+            print(f"First paint {median_first_paint:.3f}s exceeds the {args.max_first_paint:.3f}s budget.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()